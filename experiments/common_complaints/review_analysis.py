@@ -2,19 +2,59 @@ from dotenv import load_dotenv
 import os
 import json
 import asyncio
-from openai import AsyncOpenAI
-from pydantic import BaseModel
-from typing import Dict, List
+import functools
+import hashlib
+import random
+import re
+import numpy as np
+import tiktoken
+from aiolimiter import AsyncLimiter
+from diskcache import Cache
+from openai import AsyncOpenAI, RateLimitError
+from typing import Collection, Dict, List, Tuple
 import time
 
-# https://platform.openai.com/docs/guides/structured-outputs
-
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
+MODEL = "gpt-5-nano"
 MAX_CONCURRENT_REQUESTS = 5
+# account rate limits; the live path paces itself to stay under both
+MAX_REQUESTS_PER_MINUTE = 500
+MAX_TOKENS_PER_MINUTE = 200_000
+MAX_RATE_LIMIT_RETRIES = 6
+# reviews sent together in one request, so the category instructions are paid for once per group
+REVIEWS_PER_REQUEST = 10
+# seconds between Batch API status checks
+BATCH_POLL_INTERVAL = 30
+
+CACHE_DIR = "experiments/common_complaints/.cache"
+# bump whenever CATEGORIES or the prompt changes so cached categorizations are invalidated
+PROMPT_VERSION = 4
+
+rpm_limiter = AsyncLimiter(MAX_REQUESTS_PER_MINUTE, 60)
+tpm_limiter = AsyncLimiter(MAX_TOKENS_PER_MINUTE, 60)
+
+
+@functools.cache
+def get_cache() -> Cache:
+    """Open the categorization cache on first use, so importing this module doesn't create CACHE_DIR."""
+    return Cache(CACHE_DIR)
+
+
+@functools.cache
+def get_encoding() -> tiktoken.Encoding:
+    """Load MODEL's tokenizer on first use; tiktoken may need to download it, which only the live path needs."""
+    try:
+        return tiktoken.encoding_for_model(MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+# categorizations are appended here as they complete so an interrupted live run can resume
+CHECKPOINT_PATH = "experiments/common_complaints/categorized.jsonl"
 
 CATEGORIES = {
     "learning_curve_and_complexity": {
@@ -44,159 +84,432 @@ CATEGORIES = {
 }
 
 
-class LearningCurveAndComplexity(BaseModel):
-    learning_champions: bool = False
-    understanding_systems: bool = False
-    steep_curve: bool = False
-    bad_tutorial: bool = False
-    mechanics_difficult: bool = False
+# flattened (major category, subcategory) order of the 0/1 flags the model returns per review
+FIELDS = [(major, sub) for major, subs in CATEGORIES.items() for sub in subs]
+FLAGS_PATTERN = re.compile(rf"(?<![01])[01]{{{len(FIELDS)}}}(?![01])")
 
 
-class HostileCommunityEnvironment(BaseModel):
-    flamed_for_mistakes: bool = False
-    toxic_teammates: bool = False
+def build_category_prompt(categories: Dict) -> str:
+    """Describe every major category and its subcategories for the prompt."""
+    prompt = ""
+    for major_category, subcategories in categories.items():
+        prompt += f"{major_category.replace('_', ' ').title()}:\n"
+        for key, desc in subcategories.items():
+            prompt += f"  - {key}: {desc}\n"
+        prompt += "\n"
+    return prompt
+
+
+# the static instructions, taxonomy and examples form one system prompt that is identical for every
+# request, so OpenAI can serve it from its prompt cache; only the user message (the reviews) changes
+PROMPT_HEADER = "You are an expert at analyzing player reviews for video games. You will be given numbered reviews; categorize each one into the appropriate complaint categories.\n\nCategories:\n\n"
+CATEGORY_PROMPT = build_category_prompt(CATEGORIES)
+FIELD_ORDER_PROMPT = ", ".join(sub for _, sub in FIELDS)
+FOOTER_INSTRUCTIONS = (
+    "Analyze each review and output one line per review, in the same order as the reviews, and nothing else. "
+    f"Each line is exactly {len(FIELDS)} characters, each '0' or '1', saying whether these subcategories apply in this order: "
+    f"{FIELD_ORDER_PROMPT}.\n\n"
+    "Guidelines:\n"
+    "- Use '1' only when the review complains about that subcategory, directly or clearly implied; praise and neutral mentions are '0'.\n"
+    "- A review can match several subcategories, or none at all.\n"
+    "- Reviews may be written in any language, and may be sarcastic; judge what the reviewer actually complains about.\n"
+    "- Do not number the output lines or add explanations.\n\n"
+)
+EXAMPLES_PROMPT = (
+    "Example reviews:\n"
+    "[1] Way too many champions to learn and every one has four abilities plus a passive. I gave up after a week.\n"
+    "[2] My team spammed question mark pings and called me trash every time I died. I reported them and nothing happened.\n"
+    "[3] Brand new account and I'm matched against people with a thousand games who are obviously smurfing. Games take 40 minutes too.\n"
+    "[4] The client crashes after every game and the camera feels clunky.\n"
+    "[5] Fun game, I've played it with friends for years. Great art and music.\n"
+    "[6] You need hundreds of hours before you understand items, runes and wave management, and the tutorial teaches none of it. Climbing ranked is impossible unless you grind every day.\n"
+    "[7] Last-hitting minions is so hard, I miss half my CS and then get flamed for it.\n"
+    "[8] Queue times are over ten minutes at night.\n"
+    "[9] Matchmaking puts me with Iron players against Diamonds, and every loss is someone else's fault according to chat.\n"
+    "[10] O jogo é bom, mas a comunidade é muito tóxica e te xingam por qualquer erro.\n"
+    "[11] It takes forever to unlock champions and runes without paying, progress is painfully slow.\n"
+    "[12] Ten years in and the shop UI still lags, the patcher breaks every other update, and I disconnect mid-game.\n"
+    "[13] Just don't. You have to watch guides for hours to understand which jungle camps to take and when to roam.\n"
+    "[14] Best MOBA ever, but be ready to lose a lot at first: the other team will be far better than you because of smurfs.\n"
+    "[15] The game is dead at my rank, 15 minute queues and then a 50 minute game.\n"
+    "Example output:\n"
+    "10000000000000\n"
+    "00000110000000\n"
+    "00000001101000\n"
+    "00000000000011\n"
+    "00000000000000\n"
+    "01110000000100\n"
+    "00001100000000\n"
+    "00000000010000\n"
+    "00000010100000\n"
+    "00000110000000\n"
+    "00000000000100\n"
+    "00000000000011\n"
+    "01100000000000\n"
+    "00000001100000\n"
+    "00000000011000\n"
+)
+SYSTEM_PROMPT = PROMPT_HEADER + CATEGORY_PROMPT + FOOTER_INSTRUCTIONS + EXAMPLES_PROMPT
+
+
+def build_messages(reviews: List[str]) -> List[Dict]:
+    """Build the chat messages used to categorize a group of reviews in one request."""
+    numbered_reviews = "".join(f"[{i + 1}] {review}\n" for i, review in enumerate(reviews))
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Reviews:\n{numbered_reviews}\nOutput exactly {len(reviews)} lines."}
+    ]
 
 
-class MatchmakingIssues(BaseModel):
-    smurfs: bool = False
-    unfair_matchmaking: bool = False
-    long_queue: bool = False
-    long_matches: bool = False
+def cache_key(review: str) -> str:
+    """Key a review's categorization by model, prompt version and review text."""
+    return hashlib.sha256(f"{MODEL}|{PROMPT_VERSION}|{review}".encode()).hexdigest()
 
 
-class TimeInvestmentRequirements(BaseModel):
-    slow_progress: bool = False
+@functools.cache
+def system_prompt_tokens() -> int:
+    """Token count of SYSTEM_PROMPT, which is identical in every request."""
+    return len(get_encoding().encode(SYSTEM_PROMPT))
 
 
-class TechnicalAndInterfaceIssues(BaseModel):
-    bad_ui: bool = False
-    client_bugs: bool = False
+def estimate_tokens(messages: List[Dict]) -> int:
+    """Estimate the prompt tokens of a request, for pacing against MAX_TOKENS_PER_MINUTE."""
+    encoding = get_encoding()
+    return sum(
+        system_prompt_tokens() if message["content"] == SYSTEM_PROMPT else len(encoding.encode(message["content"]))
+        for message in messages
+    )
 
 
-class ReviewCategories(BaseModel):
-    learning_curve_and_complexity: LearningCurveAndComplexity
-    hostile_community_environment: HostileCommunityEnvironment
-    matchmaking_issues: MatchmakingIssues
-    time_investment_requirements: TimeInvestmentRequirements
-    technical_and_interface_issues: TechnicalAndInterfaceIssues
+def chunk_reviews(pending: List[Tuple[int, str]], size: int = REVIEWS_PER_REQUEST) -> List[List[Tuple[int, str]]]:
+    """Split (index, review) pairs into groups that are categorized by a single request."""
+    return [pending[i:i + size] for i in range(0, len(pending), size)]
 
 
-async def categorize_review(review: str, review_index: int) -> Dict:
-    """
-    Use OpenAI API to categorize a review into zero or more complaint categories.
-    """
-    prompt = "You are an expert at analyzing player reviews for video games. Given the following review, categorize it into the appropriate complaint categories. Return a structured JSON response.\n\nCategories:\n\n"
+def decode_flags(flags: str) -> Dict:
+    """Turn one review's 0/1 string into the nested {major: {sub: bool}} categories."""
+    categories = {major: {} for major in CATEGORIES}
+    for (major, sub), flag in zip(FIELDS, flags):
+        categories[major][sub] = flag == "1"
+    return categories
 
-    for major_category, subcategories in CATEGORIES.items():
-        prompt += f"{major_category.replace('_', ' ').title()}:\n"
-        for key, desc in subcategories.items():
-            prompt += f"  - {key}: {desc}\n"
-        prompt += "\n"
 
-    prompt += f"Review:\n{review}\n\nAnalyze this review and return a JSON object indicating which categories apply (true/false for each subcategory)."
+def unpack_categories(chunk: List[Tuple[int, str]], text: str | None) -> List[Dict]:
+    """Match a response's 0/1 lines back to its reviews and cache each categorization."""
+    lines = FLAGS_PATTERN.findall(text or "")
+    if len(lines) != len(chunk):
+        raise ValueError(f"expected {len(chunk)} categorized reviews, got {len(lines)}")
 
-    try:
-        response = await client.beta.chat.completions.parse(
-            model="gpt-5-nano",
-            messages=[
-                {"role": "system", "content": "You are an expert at analyzing player reviews for video games. Respond with structured JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format=ReviewCategories
-        )
-
-        result = response.choices[0].message.parsed
-        categories = result.model_dump() if result else ReviewCategories().model_dump()
-        
-        print(f"✓ Completed review {review_index + 1}")
-        return {
-            "review": review,
-            "categories": categories,
-            "index": review_index
-        }
+    records = []
+    for (index, review), flags in zip(chunk, lines):
+        categories = decode_flags(flags)
+        get_cache().set(cache_key(review), categories)
+        records.append({"review": review, "categories": categories, "index": index})
+    return records
 
-    except Exception as e:
-        print(f"✗ Error categorizing review {review_index + 1}: {e}")
-        # Return default structure with all False values
-        return {
-            "review": review,
-            "categories": ReviewCategories().model_dump(),
-            "index": review_index
-        }
 
+async def categorize_reviews(chunk: List[Tuple[int, str]]) -> List[Dict]:
+    """
+    Use OpenAI API to categorize a group of reviews into zero or more complaint categories.
+    Requests are paced by the RPM/TPM limiters and retried with backoff on rate limit errors;
+    any other error is raised so the group is reported as failed instead of counted as all False.
+
+    Args:
+        chunk: (index, review) pairs sent together in one request
 
-async def process_reviews_parallel(reviews: List[str], max_concurrent: int = MAX_CONCURRENT_REQUESTS) -> List[Dict]:
+    Returns:
+        One record per review, in the same order as chunk
+    """
+    label = f"reviews {chunk[0][0] + 1}-{chunk[-1][0] + 1}"
+    messages = build_messages([review for _, review in chunk])
+    tokens = min(estimate_tokens(messages), MAX_TOKENS_PER_MINUTE)
+
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        await tpm_limiter.acquire(tokens)
+        async with rpm_limiter:
+            try:
+                response = await client.chat.completions.create(
+                    model=MODEL,
+                    messages=messages
+                )
+                break
+            except RateLimitError:
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+        delay = min(60, 2 ** attempt + random.random())
+        print(f"Rate limited on {label}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    records = unpack_categories(chunk, response.choices[0].message.content)
+    print(f"✓ Completed {label}")
+    return records
+
+
+def load_checkpoint(reviews: List[str]) -> Dict[int, Dict]:
+    """
+    Read categorizations saved by an earlier, possibly interrupted, run.
+    Entries whose review text or prompt version no longer match are ignored.
+    """
+    done = {}
+    if not os.path.exists(CHECKPOINT_PATH):
+        return done
+
+    with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written line from a crash
+            index = record["index"]
+            if index < len(reviews) and record.get("key") == cache_key(reviews[index]):
+                done[index] = {
+                    "review": reviews[index],
+                    "categories": record["categories"],
+                    "index": index
+                }
+    return done
+
+
+async def process_reviews_parallel(
+    reviews: List[str],
+    max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+    skip: Collection[int] = ()
+) -> List[Dict]:
     """
     Process reviews in parallel with configurable concurrency.
+    Reviews are sent REVIEWS_PER_REQUEST at a time, duplicate review texts only once, and each successful
+    categorization is appended to CHECKPOINT_PATH as soon as its request completes.
+    Groups that fail are reported and left out of the results.
+
+    Args:
+        reviews: All reviews to categorize
+        max_concurrent: Maximum number of in-flight requests
+        skip: Indices of reviews that are already categorized
     """
     semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def process_single_review(review: str, index: int) -> Dict:
+
+    async def process_chunk(chunk: List[Tuple[int, str]]) -> List[Dict]:
         async with semaphore:
-            return await categorize_review(review, index)
-    
+            records = await categorize_reviews(chunk)
+        # the same categorization for every later copy of each review text
+        records = [
+            {**record, "index": index}
+            for record in records
+            for index in duplicates[cache_key(record["review"])]
+        ]
+
+        # no await between open and write, so appends from concurrent tasks can't interleave
+        with open(CHECKPOINT_PATH, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps({
+                    "index": record["index"],
+                    "key": cache_key(record["review"]),
+                    "categories": record["categories"]
+                }, ensure_ascii=False) + "\n")
+        return records
+
     print(f"Starting parallel processing with {max_concurrent} concurrent requests...")
     start_time = time.time()
-    
-    # Create tasks for all reviews
-    tasks = [
-        process_single_review(review, i) 
-        for i, review in enumerate(reviews)
-    ]
-    
+
+    processed_results = []
+    pending = []
+    # indices of each uncached review text; only its first occurrence is sent
+    duplicates: Dict[str, List[int]] = {}
+    for i, review in enumerate(reviews):
+        if i in skip:
+            continue
+        key = cache_key(review)
+        categories = get_cache().get(key)
+        if categories is not None:
+            processed_results.append({"review": review, "categories": categories, "index": i})
+        elif key in duplicates:
+            duplicates[key].append(i)
+        else:
+            duplicates[key] = [i]
+            pending.append((i, review))
+
+    # Create one task per group of reviews
+    tasks = [process_chunk(chunk) for chunk in chunk_reviews(pending)]
+
     # Process all tasks concurrently
     results = await asyncio.gather(*tasks, return_exceptions=True)
-    
+
     end_time = time.time()
     print(f"Parallel processing completed in {end_time - start_time:.2f} seconds")
-    
+
     # Handle any exceptions and sort by original index
-    processed_results = []
     for result in results:
         if isinstance(result, Exception):
             print(f"Task failed with exception: {result}")
             continue
-        processed_results.append(result)
-    
+        processed_results.extend(result)
+
     # Sort by original index to maintain order
     processed_results.sort(key=lambda x: x['index'])
-    
+
     return processed_results
 
 
+def build_request_body(reviews: List[str]) -> Dict:
+    """Build the /v1/chat/completions request body for a group of reviews, as sent in a batch file."""
+    return {
+        "model": MODEL,
+        "messages": build_messages(reviews)
+    }
+
+
+async def submit_batch(reviews: List[str], indices: List[int]) -> str:
+    """
+    Upload one chat completion request per group of selected reviews and start a Batch API job.
+    Batch requests are billed at half price and skip the per-request round trips.
+
+    Args:
+        reviews: All reviews; each request's custom_id lists the indices of its reviews
+        indices: Indices of the reviews to submit
+
+    Returns:
+        The batch id to pass to poll_batch
+    """
+    lines = [
+        json.dumps({
+            "custom_id": ",".join(str(i) for i, _ in chunk),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_request_body([review for _, review in chunk])
+        }, ensure_ascii=False)
+        for chunk in chunk_reviews([(i, reviews[i]) for i in indices])
+    ]
+    batch_input = await client.files.create(
+        file=("reviews_batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"Submitted batch {batch.id} with {len(lines)} requests")
+    return batch.id
+
+
+async def poll_batch(batch_id: str, reviews: List[str], poll_interval: float = BATCH_POLL_INTERVAL) -> List[Dict]:
+    """
+    Wait for a batch job to finish and parse its output into categorized reviews.
+    Parsed categories are written to the cache; requests that failed inside the batch are reported and skipped.
+    """
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            break
+        if batch.status in ("failed", "expired", "cancelling", "cancelled"):
+            raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+        counts = batch.request_counts
+        if counts:
+            print(f"Batch {batch_id} {batch.status}: {counts.completed}/{counts.total} done")
+        await asyncio.sleep(poll_interval)
+
+    if not batch.output_file_id:
+        print(f"Batch {batch_id} produced no output (see error file {batch.error_file_id})")
+        return []
+
+    output = await client.files.content(batch.output_file_id)
+
+    results = []
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        chunk = [(int(i), reviews[int(i)]) for i in record["custom_id"].split(",")]
+        label = f"reviews {chunk[0][0] + 1}-{chunk[-1][0] + 1}"
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            print(f"✗ Error categorizing {label}: {record.get('error') or response.get('body')}")
+            continue
+
+        content = response["body"]["choices"][0]["message"]["content"]
+        try:
+            results.extend(unpack_categories(chunk, content))
+        except ValueError as e:
+            print(f"✗ Error categorizing {label}: {e}")
+
+    results.sort(key=lambda x: x["index"])
+    return results
+
+
+async def process_reviews_batch(reviews: List[str], skip: Collection[int] = ()) -> List[Dict]:
+    """
+    Categorize reviews through the OpenAI Batch API.
+    Reviews already in the cache are not submitted, and duplicate review texts are submitted once.
+
+    Args:
+        reviews: All reviews to categorize
+        skip: Indices of reviews that are already categorized
+    """
+    start_time = time.time()
+
+    to_submit: Dict[str, int] = {}
+    for i, review in enumerate(reviews):
+        if i in skip:
+            continue
+        key = cache_key(review)
+        if key not in to_submit and key not in get_cache():
+            to_submit[key] = i
+
+    if to_submit:
+        batch_id = await submit_batch(reviews, list(to_submit.values()))
+        await poll_batch(batch_id, reviews)
+    print(f"Batch processing completed in {time.time() - start_time:.2f} seconds "
+          f"({len(to_submit)} of {len(reviews)} reviews submitted, the rest served from cache)")
+
+    results = []
+    for i, review in enumerate(reviews):
+        if i in skip:
+            continue
+        categories = get_cache().get(cache_key(review))
+        if categories is not None:
+            results.append({"review": review, "categories": categories, "index": i})
+    return results
+
+
 def calculate_frequencies(categorized: List[Dict]) -> Dict:
     """Calculate frequency counts for all categories."""
-    frequencies = {}
-
-    # Initialize frequency counters
-    for major_cat, subcats in CATEGORIES.items():
-        frequencies[major_cat] = {}
-        for subcat in subcats.keys():
-            frequencies[major_cat][subcat] = 0
-
-    # Count occurrences
-    for item in categorized:
-        categories = item["categories"]
-        for major_cat, subcats in categories.items():
-            if isinstance(subcats, dict):
-                for subcat, value in subcats.items():
-                    if value and subcat in frequencies[major_cat]:
-                        frequencies[major_cat][subcat] += 1
+    # one row of 0/1 flags per review, one column per FIELDS entry; every categorization has the full
+    # FIELDS schema by construction, so cells are read directly and the matrix is built in one call
+    flags = np.array(
+        [[item["categories"][major][sub] for major, sub in FIELDS] for item in categorized],
+        dtype=np.uint8,
+    ).reshape(-1, len(FIELDS))
+
+    totals = flags.sum(axis=0)
 
     # Return nested structure
+    frequencies = {major: {} for major in CATEGORIES}
+    for (major, sub), total in zip(FIELDS, totals.tolist()):
+        frequencies[major][sub] = total
     return frequencies
 
 
-async def main(max_concurrent: int = MAX_CONCURRENT_REQUESTS):
-    """Main function to process reviews and categorize them."""
+async def main(max_concurrent: int = MAX_CONCURRENT_REQUESTS, live: bool = False):
+    """
+    Main function to process reviews and categorize them.
+    Uses the Batch API by default; live=True sends requests directly, which is faster for small runs.
+    """
     try:
         with open("experiments/common_complaints/reviews.json", encoding="utf-8") as f:
             reviews = json.load(f)
 
-        print(f"Processing {len(reviews)} reviews with {max_concurrent} concurrent requests...")
+        done = load_checkpoint(reviews)
+        if done:
+            print(f"Resuming: {len(done)} reviews already categorized in {CHECKPOINT_PATH}")
+
+        if live:
+            print(f"Processing {len(reviews) - len(done)} reviews with {max_concurrent} concurrent requests...")
+            new_results = await process_reviews_parallel(reviews, max_concurrent, skip=done.keys())
+        else:
+            print(f"Processing {len(reviews) - len(done)} reviews with the Batch API...")
+            new_results = await process_reviews_batch(reviews, skip=done.keys())
 
-        # Process reviews in parallel
-        categorized = await process_reviews_parallel(reviews, max_concurrent)
+        categorized = sorted([*done.values(), *new_results], key=lambda x: x["index"])
 
         complaint_frequencies = calculate_frequencies(categorized)
 
@@ -223,20 +536,25 @@ async def main(max_concurrent: int = MAX_CONCURRENT_REQUESTS):
         print(f"Unexpected error: {e}")
 
 
-def run_with_concurrency(max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+def run_with_concurrency(max_concurrent: int = MAX_CONCURRENT_REQUESTS, live: bool = False):
     """Helper function to run the async main with configurable concurrency."""
-    asyncio.run(main(max_concurrent))
+    asyncio.run(main(max_concurrent, live))
 
 
 if __name__ == "__main__":
     import sys
-    
+
+    # --live skips the Batch API and sends requests directly
+    args = sys.argv[1:]
+    live = "--live" in args
+    args = [arg for arg in args if arg != "--live"]
+
     concurrent_requests = MAX_CONCURRENT_REQUESTS
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            concurrent_requests = int(sys.argv[1])
+            concurrent_requests = int(args[0])
             print(f"Using {concurrent_requests} concurrent requests from command line argument")
         except ValueError:
             print(f"Invalid concurrency value, using default: {MAX_CONCURRENT_REQUESTS}")
     
-    run_with_concurrency(concurrent_requests)
\ No newline at end of file
+    run_with_concurrency(concurrent_requests, live)
\ No newline at end of file
@@ -1,16 +1,30 @@
 # Script to extract review bodies from metacritic_raw.txt and save as JSON array in reviews.json
-import re
 import json
 
+SEEK_SCORE, SKIP_USERNAME, IN_BODY = range(3)
+REVIEW_END_LINES = ("Report", "Read More")
+
 def extract_reviews(text):
-	# Each review starts after a date and username, then a score, then the body, ending before 'Report' or 'Read More'
-	# We'll use a regex to find review bodies
-	# Reviews are separated by lines with a date and username, then a score, then the body, ending with 'Report' or 'Read More'
-	# We'll match blocks between a score line and 'Report' or 'Read More'
-	pattern = re.compile(r"\n\d+\n.*?\n(.*?)(?:\nReport|\nRead More)", re.DOTALL)
-	reviews = pattern.findall(text)
-	# Clean up whitespace
-	reviews = [r.strip() for r in reviews if r.strip()]
+	# Each review is a score line (0-10), a username line, then the body lines, ending before 'Report' or 'Read More'
+	# Single pass over the lines instead of a DOTALL regex, so parsing stays linear in the input size
+	reviews = []
+	state = SEEK_SCORE
+	body = []
+	for line in text.splitlines():
+		if state == SEEK_SCORE:
+			score = line.strip()
+			if score.isdigit() and 0 <= int(score) <= 10:
+				state = SKIP_USERNAME
+		elif state == SKIP_USERNAME:
+			state = IN_BODY
+		elif line in REVIEW_END_LINES:
+			review = "\n".join(body).strip()
+			if review:
+				reviews.append(review)
+			body = []
+			state = SEEK_SCORE
+		else:
+			body.append(line)
 	return reviews
 
 def main():
@@ -0,0 +1,30 @@
+from structure import extract_reviews
+import time
+
+REVIEW = "7\nsome_user\nMatchmaking keeps putting new players against smurfs.\nQueue times are long too.\nRead More\n"
+
+
+def time_extract(text: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    reviews = extract_reviews(text)
+    return time.perf_counter() - start, len(reviews)
+
+
+if __name__ == "__main__":
+    # linear scaling: a synthetic 10 MB input should take about 10x as long as a 1 MB one
+    small = REVIEW * (1_000_000 // len(REVIEW))
+    large = small * 10
+    small_time, small_count = time_extract(small)
+    large_time, large_count = time_extract(large)
+    assert large_count == small_count * 10
+    print(f"1 MB: {small_count} reviews in {small_time:.3f}s")
+    print(f"10 MB: {large_count} reviews in {large_time:.3f}s ({large_time / small_time:.1f}x)")
+    # generous headroom for timer noise; quadratic behaviour would be ~100x
+    assert large_time / small_time < 20, f"10x input took {large_time / small_time:.1f}x as long"
+
+    # a body that never ends shouldn't hang
+    unterminated_time, unterminated_count = time_extract("7\nsome_user\n" + "no end in sight\n" * 600_000)
+    print(f"10 MB unterminated review: {unterminated_count} reviews in {unterminated_time:.3f}s")
+
+    with open("experiments/common_complaints/metacritic_raw.txt", encoding="utf-8") as f:
+        print(f"metacritic_raw.txt: {len(extract_reviews(f.read()))} reviews")
@@ -1,52 +1,108 @@
 from dotenv import load_dotenv
 import os
-import requests
 import json
-import time
+import asyncio
+import tempfile
+import httpx
+from aiolimiter import AsyncLimiter
 
 load_dotenv()
 
-def main():
+MATCH_IDS_PATH = "experiments/download_matches/szge_match_ids.json"
+DATES_PATH = "experiments/download_matches/szge_match_dates.json"
+MATCH_URL = "https://americas.api.riotgames.com/lol/match/v5/matches/{match_id}"
+
+MAX_CONCURRENT_REQUESTS = 20
+# write progress to disk every this many fetched matches instead of after each one
+FLUSH_EVERY = 50
+
+def riot_rate_limiters():
+	# Riot development key limits: 20 requests per second and 100 requests per 2 minutes
+	return (AsyncLimiter(20, 1), AsyncLimiter(100, 120))
+
+def write_json_atomic(path, data):
+	# Write to a temp file next to path and swap it in, so an interrupted write never leaves a truncated file
+	with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+		json.dump(data, f, ensure_ascii=False, indent=2)
+	os.replace(f.name, path)
+
+async def get_with_backoff(client, url, limiters):
+	# GET url once every limiter allows it, retrying 429 responses with exponential backoff
+	delay = 0.1
+	while True:
+		for limiter in limiters:
+			await limiter.acquire()
+		response = await client.get(url)
+		if response.status_code != 429:
+			return response
+		print(f"Rate limit exceeded for {url}. Backing off for {delay:.2f}s.")
+		await asyncio.sleep(delay)
+		delay = min(delay * 2, 60)  # Exponential backoff, max 60s
+
+async def fetch_match_date(client, match_id, limiters, semaphore, results):
+	async with semaphore:
+		try:
+			response = await get_with_backoff(client, MATCH_URL.format(match_id=match_id), limiters)
+		except httpx.HTTPError as e:
+			print(f"Failed to fetch match {match_id}: {e}")
+			return
+	if response.status_code != 200:
+		print(f"Failed to fetch match {match_id}: {response.status_code} {response.text}")
+		return
+	data = response.json()
+	timestamp = data.get('info', {}).get('gameStartTimestamp')
+	await results.put((match_id, timestamp))
+
+async def write_progress(results, match_dates):
+	# Single writer: collect fetched dates from the queue and flush them to disk in batches
+	unflushed = 0
+	while True:
+		item = await results.get()
+		if item is None:
+			break
+		match_id, timestamp = item
+		match_dates[match_id] = timestamp
+		unflushed += 1
+		if unflushed >= FLUSH_EVERY:
+			write_json_atomic(DATES_PATH, match_dates)
+			unflushed = 0
+	write_json_atomic(DATES_PATH, match_dates)
+
+async def main():
 	api_key = os.getenv('RIOT_API_KEY')
 	if not api_key:
 		raise ValueError('RIOT_API_KEY environment variable must be set.')
 
-	with open("experiments/download_matches/szge_match_ids.json", "r", encoding="utf-8") as f:
+	with open(MATCH_IDS_PATH, "r", encoding="utf-8") as f:
 		match_ids = json.load(f)
 
-
 	# Load existing progress if available
-	dates_path = "experiments/download_matches/szge_match_dates.json"
-	if os.path.exists(dates_path):
-		with open(dates_path, "r", encoding="utf-8") as f:
+	if os.path.exists(DATES_PATH):
+		with open(DATES_PATH, "r", encoding="utf-8") as f:
 			match_dates = json.load(f)
 	else:
 		match_dates = {}
 
-	delay = 0.1
-	for match_id in match_ids:
-		if match_id in match_dates:
-			continue  # Skip already processed
-		while True:
-			url = f"https://americas.api.riotgames.com/lol/match/v5/matches/{match_id}?api_key={api_key}"
-			response = requests.get(url)
-			if response.status_code == 429:
-				print(f"Rate limit exceeded for match {match_id}. Backing off for {delay:.2f}s.")
-				time.sleep(delay)
-				delay = min(delay * 2, 60)  # Exponential backoff, max 60s
-				continue
-			elif response.status_code != 200:
-				print(f"Failed to fetch match {match_id}: {response.status_code} {response.text}")
-				break
-			data = response.json()
-			timestamp = data.get('info', {}).get('gameStartTimestamp')
-			match_dates[match_id] = timestamp
-			# Write progress after each successful fetch
-			with open(dates_path, "w", encoding="utf-8") as f:
-				json.dump(match_dates, f, ensure_ascii=False, indent=2)
-			delay = 0.1  # Reset delay after success
-			time.sleep(delay)
-			break
+	limiters = riot_rate_limiters()
+	semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+	results = asyncio.Queue()
+
+	async with httpx.AsyncClient(
+		http2=True,
+		headers={"X-Riot-Token": api_key},
+		timeout=20.0,
+		limits=httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS)
+	) as client:
+		writer = asyncio.create_task(write_progress(results, match_dates))
+		try:
+			await asyncio.gather(*(
+				fetch_match_date(client, match_id, limiters, semaphore, results)
+				for match_id in match_ids
+				if match_id not in match_dates  # Skip already processed
+			))
+		finally:
+			await results.put(None)
+			await writer
 
 if __name__ == "__main__":
-	main()
+	asyncio.run(main())
@@ -1,29 +1,44 @@
 from dotenv import load_dotenv
 import os
-import requests
 import json
+import asyncio
+import httpx
+from get_match_dates import get_with_backoff, riot_rate_limiters
 
 load_dotenv()
 
-def main():
+MATCH_IDS_URL = "https://americas.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?start={start}&count=100"
+NUM_PAGES = 10
+
+async def fetch_page(client, puuid, i, limiters):
+	start = i * 100
+	try:
+		response = await get_with_backoff(client, MATCH_IDS_URL.format(puuid=puuid, start=start), limiters)
+	except httpx.HTTPError as e:
+		print(f"Failed to fetch matches for start={start}: {e}")
+		return i, []
+	if response.status_code != 200:
+		print(f"Failed to fetch matches for start={start}: {response.status_code} {response.text}")
+		return i, []
+	return i, response.json()
+
+async def main():
 	api_key = os.getenv('RIOT_API_KEY')
 	puuid = os.getenv('PUUID')
 	if not api_key or not puuid:
 		raise ValueError('RIOT_API_KEY and PUUID environment variables must be set.')
 
+	# The pages don't depend on each other, so fetch them all at once; the limiters keep us within Riot's limits
+	limiters = riot_rate_limiters()
+	async with httpx.AsyncClient(http2=True, headers={"X-Riot-Token": api_key}, timeout=20.0) as client:
+		pages = await asyncio.gather(*(fetch_page(client, puuid, i, limiters) for i in range(NUM_PAGES)))
+
 	all_matches = []
-	for i in range(10):
-		start = i * 100
-		url = f"https://americas.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?start={start}&count=100&api_key={api_key}"
-		response = requests.get(url)
-		if response.status_code != 200:
-			print(f"Failed to fetch matches for start={start}: {response.status_code} {response.text}")
-			continue
-		matches = response.json()
+	for _, matches in sorted(pages):
 		all_matches.extend(matches)
 
 	with open("experiments/download_matches/szge_match_ids.json", "w", encoding="utf-8") as f:
 		json.dump(all_matches, f, ensure_ascii=False, indent=2)
 
 if __name__ == "__main__":
-	main()
+	asyncio.run(main())
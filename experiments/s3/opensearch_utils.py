@@ -1,16 +1,114 @@
 """
 OpenSearch utilities for managing video transcription index and searching
 """
+import functools
+import logging
 import os
-from typing import List, Dict, Optional
+import socket
+from typing import List, Dict, Iterator, Optional, Tuple
 from datetime import datetime, timedelta
-from opensearchpy import OpenSearch, RequestsHttpConnection
+import orjson
+import requests
+from urllib3.connection import HTTPConnection
+from opensearchpy import OpenSearch, RequestsHttpConnection, helpers
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.serializer import JSONSerializer
 from requests_aws4auth import AWS4Auth
 import boto3
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """
+    JSON serializer backed by orjson, for both request bodies and responses (search hits carry the
+    full transcription text, so decoding them dominates). Types orjson can't handle natively fall
+    back to JSONSerializer.default.
+    """
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(s, e)
+
+    def dumps(self, data):
+        # don't serialize strings
+        if isinstance(data, str):
+            return data
+
+        try:
+            return orjson.dumps(data, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError as e:
+            raise SerializationError(data, e)
+
+
+class SocketOptionsHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter whose pooled connections disable Nagle's algorithm and send TCP keep-alives"""
+
+    # urllib3's defaults already set TCP_NODELAY; keep-alive stops idle pooled connections being dropped silently
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+class TunedRequestsHttpConnection(RequestsHttpConnection):
+    """RequestsHttpConnection using SocketOptionsHTTPAdapter; retries are left to the OpenSearch transport"""
+
+    def __init__(self, *args, pool_maxsize: Optional[int] = None, **kwargs):
+        super().__init__(*args, pool_maxsize=pool_maxsize, **kwargs)
+        adapter = SocketOptionsHTTPAdapter(pool_maxsize=pool_maxsize or 10, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+
+# search result orderings; only a text query gives meaningful relevance scores
+RECENCY_SORT = [{"created_at": {"order": "desc"}}]
+RELEVANCE_SORT = [{"_score": {"order": "desc"}}] + RECENCY_SORT
+
+
+@functools.lru_cache(maxsize=8)
+def get_opensearch_client(
+    endpoint: str,
+    region: str,
+    access_key_id: str,
+    secret_access_key: str
+) -> OpenSearch:
+    """
+    Build an OpenSearch client signed with the given AWS credentials.
+    Cached, so everything using the same configuration shares one client and its connection pool
+    instead of repeating the credential lookup and auth setup.
+    """
+    host = endpoint.replace('https://', '').replace('http://', '')
+    credentials = boto3.Session().get_credentials()
+    awsauth = AWS4Auth(
+        access_key_id,
+        secret_access_key,
+        region,
+        'es',
+        session_token=credentials.token if credentials else None
+    )
+    
+    return OpenSearch(
+        hosts=[{'host': host, 'port': 443}],
+        http_auth=awsauth,
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=TunedRequestsHttpConnection,
+        pool_maxsize=20,
+        # a single managed endpoint: never spend round trips discovering nodes
+        sniff_on_start=False,
+        sniff_on_connection_fail=False,
+        # gzip request bodies and ask for gzipped responses; hits carry long transcription text
+        http_compress=True,
+        serializer=OrjsonSerializer()
+    )
+
 
 class OpenSearchManager:
     def __init__(self, index_name: str = "video-transcriptions"):
@@ -24,23 +122,11 @@ class OpenSearchManager:
             raise ValueError("OpenSearch configuration incomplete. Check environment variables.")
         
         # Setup OpenSearch client
-        host = self.opensearch_endpoint.replace('https://', '').replace('http://', '')
-        credentials = boto3.Session().get_credentials()
-        awsauth = AWS4Auth(
-            self.aws_access_key_id,
-            self.aws_secret_access_key,
+        self.client = get_opensearch_client(
+            self.opensearch_endpoint,
             self.aws_region,
-            'es',
-            session_token=credentials.token if credentials else None
-        )
-        
-        self.client = OpenSearch(
-            hosts=[{'host': host, 'port': 443}],
-            http_auth=awsauth,
-            use_ssl=True,
-            verify_certs=True,
-            connection_class=RequestsHttpConnection,
-            pool_maxsize=20
+            self.aws_access_key_id,
+            self.aws_secret_access_key
         )
 
     def create_index(self, force_recreate: bool = False):
@@ -118,7 +204,8 @@ class OpenSearchManager:
         tags: Optional[List[str]] = None,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-        size: int = 10
+        size: int = 10,
+        fields: Optional[List[str]] = None
     ) -> Dict:
         """
         Search transcriptions with various filters
@@ -129,6 +216,9 @@ class OpenSearchManager:
             date_from: Optional start date for filtering
             date_to: Optional end date for filtering
             size: Number of results to return
+            fields: Optional list of source fields to return instead of whole documents.
+                When the transcription is left out of a text search, matching snippets of it
+                are returned under each hit's "highlight" instead
             
         Returns:
             OpenSearch response dictionary
@@ -167,31 +257,25 @@ class OpenSearchManager:
                 }
             })
         
-        # Build the query
-        if must_clauses:
-            search_body = {
-                "query": {
-                    "bool": {
-                        "must": must_clauses
+        # Build the query; with no search criteria this returns the most recent documents
+        search_body = {
+            "query": {"bool": {"must": must_clauses}} if must_clauses else {"match_all": {}},
+            "size": size,
+            "sort": RELEVANCE_SORT if query else RECENCY_SORT
+        }
+        
+        # transcriptions make up most of each document, so only ship them when asked for
+        if fields is not None:
+            search_body["_source"] = fields
+            if query and "transcription" not in fields:
+                search_body["highlight"] = {
+                    "fields": {
+                        "transcription": {
+                            "fragment_size": 150,
+                            "number_of_fragments": 3
+                        }
                     }
-                },
-                "size": size,
-                "sort": [
-                    {"_score": {"order": "desc"}},
-                    {"created_at": {"order": "desc"}}
-                ]
-            }
-        else:
-            # If no search criteria, return recent documents
-            search_body = {
-                "query": {
-                    "match_all": {}
-                },
-                "size": size,
-                "sort": [
-                    {"created_at": {"order": "desc"}}
-                ]
-            }
+                }
         
         response = self.client.search(
             index=self.index_name,
@@ -212,6 +296,27 @@ class OpenSearchManager:
             print(f"Document not found: {e}")
             return None
 
+    def mget_documents(self, job_ids: List[str]) -> List[Dict]:
+        """Retrieve several documents by job ID in one request, in the given order; missing IDs are skipped"""
+        response = self.client.mget(
+            index=self.index_name,
+            body={"ids": job_ids}
+        )
+        return [doc['_source'] for doc in response['docs'] if doc.get('found')]
+
+    def iter_all(self, query: Optional[Dict] = None, batch_size: int = 500) -> Iterator[Dict]:
+        """
+        Iterate over every document matching query (all documents by default) using a scroll,
+        so large exports neither page deeply nor hold all results in memory
+        """
+        for hit in helpers.scan(
+            self.client,
+            index=self.index_name,
+            query=query or {"query": {"match_all": {}}},
+            size=batch_size
+        ):
+            yield hit['_source']
+
     def update_tags(self, job_id: str, tags: List[str]):
         """Update tags for an existing document"""
         self.client.update(
@@ -223,7 +328,22 @@ class OpenSearchManager:
                 }
             }
         )
-        print(f"Updated tags for {job_id}")
+        logger.debug("Updated tags for %s", job_id)
+
+    def bulk_update_tags(self, updates: List[Tuple[str, List[str]]]) -> int:
+        """Update the tags of many documents, given as (job_id, tags) pairs, in batched bulk requests"""
+        actions = (
+            {
+                "_op_type": "update",
+                "_index": self.index_name,
+                "_id": job_id,
+                "doc": {"tags": tags}
+            }
+            for job_id, tags in updates
+        )
+        updated, _ = helpers.bulk(self.client, actions, chunk_size=500, request_timeout=60)
+        logger.debug("Updated tags for %d documents", updated)
+        return updated
 
     def delete_document(self, job_id: str):
         """Delete a document from the index"""
@@ -231,7 +351,21 @@ class OpenSearchManager:
             index=self.index_name,
             id=job_id
         )
-        print(f"Deleted document {job_id}")
+        logger.debug("Deleted document %s", job_id)
+
+    def bulk_delete_documents(self, job_ids: List[str]) -> int:
+        """Delete many documents from the index in batched bulk requests"""
+        actions = (
+            {
+                "_op_type": "delete",
+                "_index": self.index_name,
+                "_id": job_id
+            }
+            for job_id in job_ids
+        )
+        deleted, _ = helpers.bulk(self.client, actions, chunk_size=500, request_timeout=60)
+        logger.debug("Deleted %d documents", deleted)
+        return deleted
 
     def get_stats(self) -> Dict:
         """Get index statistics"""
@@ -259,13 +393,16 @@ def main():
     results = manager.search_transcriptions(
         query="python programming",
         tags=["tutorial"],
-        size=5
+        size=5,
+        fields=["title", "created_at", "tags"]
     )
     
     print(f"Found {results['hits']['total']['value']} results")
     for hit in results['hits']['hits']:
         source = hit['_source']
         print(f"- {source.get('title', 'Untitled')} (Score: {hit['_score']:.2f})")
+        for snippet in hit.get('highlight', {}).get('transcription', []):
+            print(f"    ...{snippet}...")
     
     # Get index stats
     stats = manager.get_stats()
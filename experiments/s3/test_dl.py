@@ -1,15 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import yt_dlp
 
 URLS = ['https://www.youtube.com/watch?v=qf27qzFKv60']
+# more parallel downloads than this risks YouTube throttling
+MAX_PARALLEL_DOWNLOADS = 4
 
 ydl_opts = {
     'format': 'm4a/worstaudio/worst',
     # ℹ️ See help(yt_dlp.postprocessor) for a list of available Postprocessors and their arguments
-    'postprocessors': [{  # Extract audio using ffmpeg
-        'key': 'FFmpegExtractAudio',
-        'preferredcodec': 'm4a',
+    # FFmpegExtractAudio would run ffmpeg even when the download already is m4a; the remuxer only
+    # rewrites the container (no transcode), and is skipped entirely for m4a downloads
+    'postprocessors': [{
+        'key': 'FFmpegVideoRemuxer',
+        'preferedformat': 'm4a',
     }]
 }
 
-with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-    error_code = ydl.download(URLS)
\ No newline at end of file
+
+def download(url: str) -> int:
+    # one YoutubeDL per download, since an instance isn't safe to share across threads
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        return ydl.download([url])
+
+
+with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as executor:
+    error_codes = list(executor.map(download, URLS))
+error_code = max(error_codes, default=0)
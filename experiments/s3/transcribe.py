@@ -1,20 +1,79 @@
 import os
 import asyncio
+import functools
+import logging
+import logging.handlers
+import math
+import queue
+import subprocess
+import time
+from collections import defaultdict, deque
+from contextlib import aclosing
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List
+from itertools import islice
+from typing import Optional, Dict, List, AsyncIterator
 from enum import Enum
 from datetime import datetime
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 from yt_dlp import YoutubeDL
 from dotenv import load_dotenv
-from openai import OpenAI
-from opensearchpy import OpenSearch, RequestsHttpConnection
-from requests_aws4auth import AWS4Auth
-import boto3
+import openai
+from openai import AsyncOpenAI
+from opensearchpy import helpers
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError, TransportError
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from opensearch_utils import get_opensearch_client
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# audio is fetched in byte ranges of this size, up to DOWNLOAD_CONNECTIONS at a time
+DOWNLOAD_CHUNK_SIZE = 10 * 1024 * 1024
+DOWNLOAD_CONNECTIONS = 4
+# block size when feeding an already downloaded file to ffmpeg
+FILE_READ_CHUNK_SIZE = 1024 * 1024
+# with a local model, at most this many queued audio files are transcribed per batch
+LOCAL_BATCH_FILES = 8
+# only the end of ffmpeg's stderr is kept, for the error raised when it fails
+FFMPEG_STDERR_TAIL = 8 * 1024
+# bulk requests are split to stay under this size (AWS OpenSearch rejects HTTP requests over 10 MiB);
+# a document too large to fit in one on its own fails its job instead of the whole upload
+MAX_BULK_BYTES = 9 * 1024 * 1024
+# backoff between retries of OpenAI/OpenSearch calls, unless the server says how long to wait
+RETRY_BACKOFF = wait_exponential_jitter(initial=1, max=30)
+MAX_RETRY_AFTER = 60
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed OpenAI/OpenSearch call is worth retrying: rate limits, timeouts, dropped connections, 5xx"""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError,
+                          openai.APIConnectionError, openai.InternalServerError)):
+        return True
+    if isinstance(error, OpenSearchConnectionError):
+        return True
+    if isinstance(error, TransportError):
+        return error.status_code in (429, 502, 503, 504)
+    return False
+
+
+def wait_retry_after(retry_state: RetryCallState) -> float:
+    """Wait as long as the server's Retry-After header asks, otherwise back off exponentially with jitter"""
+    response = getattr(retry_state.outcome.exception(), 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    try:
+        return min(float(retry_after), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return RETRY_BACKOFF(retry_state)
+
+
+class RangeNotSupportedError(Exception):
+    """The media server answered a byte range request with the whole file"""
+
 
 class ProcessingStage(Enum):
     PENDING = "pending"
@@ -40,6 +99,13 @@ class TranscriptionJob:
     completed_at: Optional[datetime] = None
     audio_file_path: Optional[str] = None
     tags: List[str] = field(default_factory=list)
+    # monotonic clock readings for measuring processing time; created_at/completed_at are only for display
+    start_ns: int = field(default_factory=time.monotonic_ns)
+    end_ns: Optional[int] = None
+
+    @property
+    def processing_time_seconds(self) -> Optional[float]:
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns is not None else None
 
 
 class VideoTranscriber:
@@ -50,14 +116,25 @@ class VideoTranscriber:
         cleanup_files: bool = True,
         audio_output_dir: Optional[str] = os.path.join(
             os.getcwd(), "downloaded_audios"),
-        opensearch_index: str = "video-transcriptions"
+        opensearch_index: str = "video-transcriptions",
+        local_model: Optional[str] = None
     ):
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         if not self.openai_api_key:
             raise ValueError(
                 "OPENAI_API_KEY not found in environment variables")
 
-        self.client = OpenAI(api_key=self.openai_api_key)
+        # one pooled HTTP/2 client for all OpenAI calls, sized for every concurrent job's requests
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=max_concurrent_jobs * 4,
+                max_keepalive_connections=max_concurrent_jobs * 4
+            ),
+            timeout=httpx.Timeout(600.0, connect=10.0)
+        )
+        # retries are handled by self._retrying() so they are not compounded with the SDK's own
+        self.client = AsyncOpenAI(api_key=self.openai_api_key, http_client=self._http, max_retries=0)
 
         # OpenSearch configuration
         self.opensearch_endpoint = os.getenv('AWS_OPENSEARCH_ENDPOINT')
@@ -67,170 +144,363 @@ class VideoTranscriber:
         self.opensearch_index = opensearch_index
 
         if self.opensearch_endpoint and self.aws_access_key_id and self.aws_secret_access_key:
-            # Remove https:// prefix if present
-            host = self.opensearch_endpoint.replace('https://', '').replace('http://', '')
-            
-            # Create AWS4Auth instance
-            credentials = boto3.Session().get_credentials()
-            awsauth = AWS4Auth(
-                self.aws_access_key_id,
-                self.aws_secret_access_key,
+            # shared with every other transcriber/OpenSearchManager in the process using the same configuration
+            self.opensearch_client = get_opensearch_client(
+                self.opensearch_endpoint,
                 self.aws_region,
-                'es',
-                session_token=credentials.token if credentials else None
-            )
-            
-            self.opensearch_client = OpenSearch(
-                hosts=[{'host': host, 'port': 443}],
-                http_auth=awsauth,
-                use_ssl=True,
-                verify_certs=True,
-                connection_class=RequestsHttpConnection,
-                pool_maxsize=20
+                self.aws_access_key_id,
+                self.aws_secret_access_key
             )
         else:
             self.opensearch_client = None
-            print("Warning: OpenSearch credentials not fully configured; upload will skip.")
+            logger.warning("OpenSearch credentials not fully configured; upload will skip.")
+
+        # faster-whisper model name/path to transcribe locally on the GPU instead of with the OpenAI API
+        self.local_model = local_model
+        self._local_pipeline = None
+        self._local_queue: Optional[asyncio.Queue] = None
+        self._local_worker: Optional[asyncio.Task] = None
 
         self.max_concurrent_jobs = max_concurrent_jobs
         self.max_retries = max_retries
         self.cleanup_files = cleanup_files
         self.audio_output_dir = audio_output_dir
         os.makedirs(self.audio_output_dir, exist_ok=True)
-        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        # admission control: at most self.max_concurrent_jobs jobs are active; unlike a Semaphore the
+        # limit can be changed while jobs are running (see set_concurrency)
+        self._active_jobs = 0
+        self._admission = asyncio.Condition()
+        # blocking calls (yt-dlp, OpenSearch, local transcription) run here rather than in the loop's default
+        # executor, sized so every stage of every concurrent job can block at the same time
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(32, max_concurrent_jobs * 8),
+            thread_name_prefix="transcriber"
+        )
         self._jobs: Dict[str, TranscriptionJob] = {}
+        # the same jobs indexed by status (job_id -> job) so status queries skip a scan; only change status via _set_status
+        self._jobs_by_status: Dict[ProcessingStage, Dict[str, TranscriptionJob]] = defaultdict(dict)
+        # transcribed jobs waiting to be indexed in one bulk request at the end of transcribe_videos;
+        # they stay UPLOADING until that request succeeds
+        self._pending_uploads: List[TranscriptionJob] = []
+
+    async def close(self):
+        """Shut down the worker threads and HTTP connections; call once the transcriber is no longer needed"""
+        self._executor.shutdown(wait=True)
+        await self._http.aclose()
+
+    def _retrying(self) -> AsyncRetrying:
+        """Retry policy for OpenAI/OpenSearch calls: transient errors are retried up to self.max_retries times"""
+        return AsyncRetrying(
+            wait=wait_retry_after,
+            stop=stop_after_attempt(self.max_retries + 1),
+            retry=retry_if_exception(is_transient_error),
+            reraise=True
+        )
+
+    def _set_status(self, job: TranscriptionJob, status: ProcessingStage):
+        self._jobs_by_status[job.status].pop(job.job_id, None)
+        job.status = status
+        self._jobs_by_status[status][job.job_id] = job
+
+    def get_jobs_by_status(self, status: ProcessingStage) -> List[TranscriptionJob]:
+        """All jobs submitted to this transcriber that are currently in the given stage"""
+        return list(self._jobs_by_status[status].values())
 
     def _generate_job_id(self) -> str:
         """Generate unique job ID"""
         return str(uuid.uuid4())
 
     async def transcribe_videos(self, video_urls: List[str], tags: List[str] = None) -> List[TranscriptionJob]:
-        """Main entry point for transcribing multiple videos."""
+        """
+        Main entry point for transcribing multiple videos.
+        Jobs run as a pipeline: downloads of the next videos overlap transcription of earlier ones, with a
+        bounded queue in between so downloads can't run far ahead of transcription.
+        Indexing is batched into one bulk upload at the end.
+        """
         jobs = []
-        tasks = []
+        transcribe_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent_jobs)
+        transcribers = [
+            asyncio.create_task(self._transcription_worker(transcribe_queue))
+            for _ in range(self.max_concurrent_jobs)
+        ]
+        downloads = []
 
         for url in video_urls:
             job = TranscriptionJob(
                 url=url,
                 job_id=self._generate_job_id(),
-                created_at=datetime.now(),
                 tags=tags if tags else []
             )
             self._jobs[job.job_id] = job
+            self._jobs_by_status[job.status][job.job_id] = job
             jobs.append(job)
 
             task = asyncio.create_task(
-                self._process_video_with_semaphore(job)
+                self._download_with_admission(job, transcribe_queue)
             )
-            tasks.append(task)
+            downloads.append(task)
+
+        await asyncio.gather(*downloads, return_exceptions=True)
+        await transcribe_queue.join()
+        for worker in transcribers:
+            worker.cancel()
 
-        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._local_worker:
+            self._local_worker.cancel()
+            self._local_worker = None
+
+        if self._pending_uploads:
+            await self._flush_uploads()
 
         return jobs
 
-    async def _process_video_with_semaphore(self, job: TranscriptionJob):
-        async with self._semaphore:
-            await self._process_video(job)
+    async def set_concurrency(self, max_concurrent_jobs: int):
+        """Change how many downloads may run at once, e.g. to back off when rate-limited"""
+        async with self._admission:
+            self.max_concurrent_jobs = max_concurrent_jobs
+            self._admission.notify_all()
 
-    async def _process_video(self, job: TranscriptionJob):
-        """Process a single video through all stages"""
+    async def _download_with_admission(self, job: TranscriptionJob, transcribe_queue: asyncio.Queue):
+        async with self._admission:
+            await self._admission.wait_for(lambda: self._active_jobs < self.max_concurrent_jobs)
+            self._active_jobs += 1
+        try:
+            if await self._download_video(job):
+                # waits while the transcription stage is full, holding back further downloads
+                await transcribe_queue.put(job)
+        finally:
+            async with self._admission:
+                self._active_jobs -= 1
+                self._admission.notify(1)
+
+    async def _transcription_worker(self, transcribe_queue: asyncio.Queue):
+        while True:
+            job = await transcribe_queue.get()
+            try:
+                await self._finish_video(job)
+            finally:
+                transcribe_queue.task_done()
+
+    async def _download_video(self, job: TranscriptionJob) -> bool:
+        """Download stage of a job; returns whether the job can move on to transcription"""
         try:
-            job.status = ProcessingStage.DOWNLOADING
+            self._set_status(job, ProcessingStage.DOWNLOADING)
             audio_path, video_info = await self._download_audio(job.url)
             job.audio_file_path = audio_path
             job.title = video_info.get('title', 'Untitled')
 
-            print(f"Audio saved to: {audio_path}")
+            logger.info("Audio saved to: %s", audio_path)
+            return True
 
+        except Exception as e:
+            self._fail_job(job, e)
+            self._cleanup_audio(job)
+            return False
+
+    async def _finish_video(self, job: TranscriptionJob):
+        """Transcription and upload stages of a downloaded job"""
+        try:
             # Transcribe
-            job.status = ProcessingStage.TRANSCRIBING
-            transcription_result = await self._transcribe_audio(audio_path)
+            self._set_status(job, ProcessingStage.TRANSCRIBING)
+            transcription_result = await self._transcribe_audio(job.audio_file_path)
             job.transcription = transcription_result
 
             # Summarize (optional - uncomment if needed)
-            # job.status = ProcessingStage.SUMMARIZING
+            # self._set_status(job, ProcessingStage.SUMMARIZING)
             # job.summary = await self._summarize_text(job.transcription)
 
-            # Upload to OpenSearch
+            job.end_ns = time.monotonic_ns()
+            job.completed_at = datetime.now()
+
+            # Upload to OpenSearch; the job completes once _flush_uploads has indexed it
             if self.opensearch_client:
-                job.status = ProcessingStage.UPLOADING
+                self._set_status(job, ProcessingStage.UPLOADING)
                 await self._upload_to_opensearch(job)
-
-            job.completed_at = datetime.now()
-            job.status = ProcessingStage.COMPLETED
+            else:
+                self._set_status(job, ProcessingStage.COMPLETED)
 
         except Exception as e:
-            job.error = str(e)
-            job.status = ProcessingStage.FAILED
-            print(f"Error processing {job.url}: {e}")
+            self._fail_job(job, e)
         finally:
-            if self.cleanup_files and job.audio_file_path and os.path.exists(job.audio_file_path):
-                try:
-                    os.remove(job.audio_file_path)
-                    print(f"Removed audio file: {job.audio_file_path}")
-                except Exception as e:
-                    print(f"Error cleaning up file {job.audio_file_path}: {e}")
+            self._cleanup_audio(job)
+
+    def _fail_job(self, job: TranscriptionJob, error: Exception):
+        job.error = str(error)
+        self._set_status(job, ProcessingStage.FAILED)
+        logger.error("Error processing %s: %s", job.url, error)
+
+    def _cleanup_audio(self, job: TranscriptionJob):
+        if self.cleanup_files and job.audio_file_path and os.path.exists(job.audio_file_path):
+            try:
+                os.remove(job.audio_file_path)
+                logger.debug("Removed audio file: %s", job.audio_file_path)
+            except Exception as e:
+                logger.warning("Error cleaning up file %s: %s", job.audio_file_path, e)
 
     async def _download_audio(self, url: str) -> tuple[str, dict]:
-        """Download audio from video URL using yt-dlp and save to output dir with optional processing"""
+        """Download audio from video URL and save to output dir with optional processing"""
         loop = asyncio.get_event_loop()
 
-        def download():
+        def extract_info():
+            # yt-dlp only resolves the audio format; plain HTTP media is fetched by _stream_media
             with YoutubeDL({
                 'format': 'bestaudio/best',
-                'outtmpl': os.path.join(self.audio_output_dir, '%(id)s.%(ext)s'),
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
                 'quiet': True,
                 'no_warnings': True,
                 'extract_flat': False,
             }) as ydl:
-                info = ydl.extract_info(url, download=False)
-                video_id = info['id']
-
-                ydl.download([url])
+                return ydl.extract_info(url, download=False)
 
-                initial_audio_file = os.path.join(
-                    self.audio_output_dir, f"{video_id}.mp3")
+        info = await loop.run_in_executor(self._executor, extract_info)
+        video_id = info['id']
+        processed_audio_file = os.path.join(
+            self.audio_output_dir, f"{video_id}_processed.mp3")
 
-                if not os.path.exists(initial_audio_file):
-                    raise FileNotFoundError(
-                        f"Downloaded audio file not found for video {video_id}")
+        if info.get('protocol') not in ('http', 'https'):
+            # HLS/DASH formats: info['url'] is a playlist or manifest, not the audio, so yt-dlp downloads them
+            return await self._download_with_ytdlp(url, info, processed_audio_file)
 
-                processed_audio_file = self._preprocess_audio(
-                    initial_audio_file, video_id)
+        media_stream = self._stream_media(info['url'], info.get('http_headers', {}), info.get('filesize'))
+        initial_audio_file = os.path.join(
+            self.audio_output_dir, f"{video_id}.{info['ext']}")
+        processed = False
+        try:
+            async with aclosing(media_stream):
+                with open(initial_audio_file, 'wb') as raw:
+                    async def tee() -> AsyncIterator[bytes]:
+                        # keep the downloaded bytes to fall back on; closing tee() leaves media_stream open
+                        async for chunk in media_stream:
+                            raw.write(chunk)
+                            yield chunk
 
-                # Remove the original file and use the processed one
-                if processed_audio_file != initial_audio_file:
                     try:
-                        os.remove(initial_audio_file)
-                    except Exception as e:
-                        print(
-                            f"Warning: Could not remove original audio file {initial_audio_file}: {e}")
+                        await self._preprocess_audio(tee(), processed_audio_file)
+                        processed = True
+                    except subprocess.CalledProcessError as e:
+                        logger.warning("FFmpeg processing failed: %s", e.stderr)
+                    except FileNotFoundError:
+                        logger.warning("FFmpeg not found. Please install FFmpeg to use audio processing features.")
+
+                    if not processed:
+                        # finish the unprocessed copy from wherever ffmpeg stopped reading
+                        async for chunk in media_stream:
+                            raw.write(chunk)
+        except BaseException:
+            self._remove_files(processed_audio_file, initial_audio_file)
+            raise
+
+        if processed:
+            self._remove_files(initial_audio_file)
+            return processed_audio_file, info
+
+        self._remove_files(processed_audio_file)
+        logger.info("Falling back to original file: %s", initial_audio_file)
+        return initial_audio_file, info
+
+    @staticmethod
+    def _remove_files(*paths: str):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def _download_with_ytdlp(self, url: str, info: dict, processed_audio_file: str) -> tuple[str, dict]:
+        """Download a format that isn't a single HTTP file with yt-dlp's own downloader, then preprocess it"""
+        loop = asyncio.get_event_loop()
 
-                return processed_audio_file, info
+        def download() -> str:
+            with YoutubeDL({
+                'format': 'bestaudio/best',
+                'outtmpl': os.path.join(self.audio_output_dir, '%(id)s.%(ext)s'),
+                'quiet': True,
+                'no_warnings': True,
+            }) as ydl:
+                return ydl.prepare_filename(ydl.extract_info(url, download=True))
 
-        # Run in executor to avoid blocking
-        audio_file, info = await loop.run_in_executor(None, download)
-        return audio_file, info
+        initial_audio_file = await loop.run_in_executor(self._executor, download)
+        try:
+            await self._preprocess_audio(self._read_file(initial_audio_file), processed_audio_file)
+            self._remove_files(initial_audio_file)
+            return processed_audio_file, info
+        except subprocess.CalledProcessError as e:
+            logger.warning("FFmpeg processing failed: %s", e.stderr)
+        except FileNotFoundError:
+            logger.warning("FFmpeg not found. Please install FFmpeg to use audio processing features.")
+        except BaseException:
+            self._remove_files(processed_audio_file, initial_audio_file)
+            raise
 
-    def _preprocess_audio(
-        self,
-        input_file: str,
-        video_id: str,
-        remove_silence: bool = True,
-        speed_multiplier: float = 1.5,
-        silence_threshold: str = "-50dB"
-    ) -> str:
-        """Process audio file to remove silence and/or adjust speed using ffmpeg"""
-        import subprocess
+        self._remove_files(processed_audio_file)
+        logger.info("Falling back to original file: %s", initial_audio_file)
+        return initial_audio_file, info
 
-        output_file = os.path.join(
-            self.audio_output_dir, f"{video_id}_processed.mp3")
+    async def _read_file(self, path: str) -> AsyncIterator[bytes]:
+        """Read a local file in blocks without blocking the event loop"""
+        loop = asyncio.get_event_loop()
+        with open(path, 'rb') as f:
+            while chunk := await loop.run_in_executor(self._executor, f.read, FILE_READ_CHUNK_SIZE):
+                yield chunk
 
+    async def _stream_media(self, media_url: str, headers: dict, size: Optional[int]) -> AsyncIterator[bytes]:
+        """
+        Yield the content of a media URL in order. When the size is known, byte ranges are fetched over
+        several connections at once (media servers throttle each connection), a bounded window ahead
+        of the consumer
+        """
+        async with httpx.AsyncClient(headers=headers, timeout=60.0, follow_redirects=True) as client:
+            if size:
+                ranges = self._stream_ranges(client, media_url, size)
+                yielded = False
+                try:
+                    async with aclosing(ranges):
+                        async for chunk in ranges:
+                            yielded = True
+                            yield chunk
+                    return
+                except RangeNotSupportedError:
+                    if yielded:
+                        raise
+                    logger.info("Server ignored byte ranges for %s; downloading it in a single stream", media_url)
+
+            async with client.stream("GET", media_url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(1 << 20):
+                    yield chunk
+
+    async def _stream_ranges(self, client: httpx.AsyncClient, media_url: str, size: int) -> AsyncIterator[bytes]:
+        """Yield a media URL's content fetched as byte ranges, up to DOWNLOAD_CONNECTIONS at a time"""
+        async def fetch_range(start: int) -> bytes:
+            end = min(start + DOWNLOAD_CHUNK_SIZE, size) - 1
+            request = client.build_request("GET", media_url, headers={"Range": f"bytes={start}-{end}"})
+            response = await client.send(request, stream=True)
+            try:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    # the whole file is coming back; close it unread
+                    raise RangeNotSupportedError(media_url)
+                return await response.aread()
+            finally:
+                await response.aclose()
+
+        starts = iter(range(0, size, DOWNLOAD_CHUNK_SIZE))
+        pending = deque(
+            asyncio.create_task(fetch_range(start))
+            for start in islice(starts, DOWNLOAD_CONNECTIONS)
+        )
+        try:
+            while pending:
+                chunk = await pending.popleft()
+                next_start = next(starts, None)
+                if next_start is not None:
+                    pending.append(asyncio.create_task(fetch_range(next_start)))
+                yield chunk
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _build_filter_string(remove_silence: bool, speed_multiplier: float, silence_threshold: str) -> Optional[str]:
+        """ffmpeg -af filter chain for _preprocess_audio, or None; cached since jobs normally share the same settings"""
         filters = []
 
         if remove_silence:
@@ -243,30 +513,32 @@ class VideoTranscriber:
             filters.append(silence_filter)
 
         if speed_multiplier != 1.0:
-            # Speed up audio - ffmpeg's atempo filter works best with values between 0.5-2.0
-            # For values > 2.0, we need to chain multiple atempo filters
-            speed = speed_multiplier
-            if speed > 2.0:
-                # Chain multiple atempo filters for speeds > 2x
-                while speed > 2.0:
-                    filters.append("atempo=2.0")
-                    speed /= 2.0
-                if speed > 1.0:
-                    filters.append(f"atempo={speed:.2f}")
-            elif speed < 0.5:
-                # Chain multiple atempo filters for very slow speeds
-                while speed < 0.5:
-                    filters.append("atempo=0.5")
-                    speed *= 2.0
-                if speed < 1.0:
-                    filters.append(f"atempo={speed:.2f}")
-            else:
-                filters.append(f"atempo={speed:.2f}")
+            # ffmpeg's atempo filter only takes values between 0.5-2.0, so larger changes chain
+            # n full atempo=2.0 (or 0.5) steps, then one step for whatever factor remains
+            step = 2.0 if speed_multiplier > 1.0 else 0.5
+            n = max(0, math.ceil(abs(math.log2(speed_multiplier))) - 1)
+            filters += [f"atempo={step}"] * n
+            filters.append(f"atempo={speed_multiplier / step ** n:.2f}")
 
-        filter_string = ",".join(filters) if filters else None
+        return ",".join(filters) if filters else None
+
+    async def _preprocess_audio(
+        self,
+        chunks: AsyncIterator[bytes],
+        output_file: str,
+        remove_silence: bool = True,
+        speed_multiplier: float = 1.5,
+        silence_threshold: str = "-50dB"
+    ):
+        """
+        Stream the downloaded audio into a single ffmpeg process that removes silence and/or adjusts speed
+        and encodes the final mp3, so no intermediate file is written or encoded
+        """
+        filter_string = self._build_filter_string(remove_silence, speed_multiplier, silence_threshold)
 
         cmd = [
-            'ffmpeg', '-i', input_file,
+            'ffmpeg', '-loglevel', 'error',
+            '-i', 'pipe:0',  # Audio is streamed in while it downloads
             '-y',  # Overwrite output file
             '-ac', '1',  # Mono audio for smaller file size
             '-b:a', '64k'  # Lower bitrate for faster processing
@@ -275,41 +547,114 @@ class VideoTranscriber:
         if filter_string:
             cmd.extend(['-af', filter_string])
 
-        cmd.append(output_file)
+        cmd.extend(['-f', 'mp3', output_file])
 
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        # drained concurrently, so ffmpeg can't stall on a full stderr pipe while we feed stdin
+        stderr_task = asyncio.create_task(self._read_tail(process.stderr, FFMPEG_STDERR_TAIL))
         try:
-            # print(f"Processing audio with filters: {filter_string}")
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True)
-            # print(f"Audio processing completed: {output_file}")
-            return output_file
-        except subprocess.CalledProcessError as e:
-            print(f"FFmpeg processing failed: {e.stderr}")
-            print(f"Falling back to original file: {input_file}")
-            return input_file
-        except FileNotFoundError:
-            print(
-                "FFmpeg not found. Please install FFmpeg to use audio processing features.")
-            print(f"Falling back to original file: {input_file}")
-            return input_file
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg exited early; its exit code and stderr say why
+        except BaseException:
+            process.kill()
+            await process.wait()
+            stderr_task.cancel()
+            raise
+
+        stderr = await stderr_task
+        returncode = await process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, cmd, stderr=stderr.decode(errors='replace'))
+
+    @staticmethod
+    async def _read_tail(stream: asyncio.StreamReader, limit: int) -> bytes:
+        """Read a stream to EOF, keeping only its last `limit` bytes"""
+        tail = bytearray()
+        while chunk := await stream.read(64 * 1024):
+            tail += chunk
+            del tail[:-limit]
+        return bytes(tail)
 
     async def _transcribe_audio(self, audio_path: str) -> str:
+        if self.local_model:
+            return await self._transcribe_local(audio_path)
+
+        # hand the SDK the open file rather than its bytes: httpx streams the multipart body from disk in
+        # small blocks (rewinding it on a retry), so concurrent uploads don't each hold a whole file in memory
+        with open(audio_path, 'rb') as audio_file:
+            async for attempt in self._retrying():
+                with attempt:
+                    response = await self.client.audio.transcriptions.create(
+                        model="gpt-4o-transcribe",
+                        file=(os.path.basename(audio_path), audio_file),
+                        response_format="json",
+                        language="en"
+                    )
+        logger.debug("Input tokens: %d, output tokens: %d",
+                     response.usage.input_tokens, response.usage.output_tokens)
+        return response.text
+
+    async def _transcribe_local(self, audio_path: str) -> str:
+        """
+        Queue audio for the local model. A single worker transcribes whatever has been queued
+        in one batch, so files downloaded while a batch runs are transcribed together
+        """
+        if self._local_worker is None:
+            self._local_queue = asyncio.Queue()
+            self._local_worker = asyncio.create_task(self._local_transcription_worker())
+
+        future = asyncio.get_event_loop().create_future()
+        await self._local_queue.put((audio_path, future))
+        return await future
+
+    async def _local_transcription_worker(self):
         loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._local_queue.get()]
+            while not self._local_queue.empty() and len(batch) < LOCAL_BATCH_FILES:
+                batch.append(self._local_queue.get_nowait())
+
+            try:
+                texts = await loop.run_in_executor(
+                    self._executor, self._transcribe_batch, [path for path, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), text in zip(batch, texts):
+                    if not future.done():
+                        future.set_result(text)
 
-        def transcribe():
-            with open(audio_path, 'rb') as audio_file:
-                response = self.client.audio.transcriptions.create(
-                    model="gpt-4o-transcribe",
-                    file=audio_file,
-                    response_format="json",
-                    language="en"
-                )
-                print(
-                    f"Input tokens: {response.usage.input_tokens}, output tokens: {response.usage.output_tokens}")
-                return response.text
+    def _transcribe_batch(self, audio_paths: List[str]) -> List[str]:
+        """
+        Transcribe audio files with the local model, loaded once on first use.
+        faster-whisper batches the segments of each file through the model (batch_size)
+        """
+        if self._local_pipeline is None:
+            # optional dependency (the local-transcription extra), only needed for local transcription
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+            model = WhisperModel(self.local_model, device="cuda", compute_type="int8_float16")
+            self._local_pipeline = BatchedInferencePipeline(model=model)
 
-        result = await loop.run_in_executor(None, transcribe)
-        return result
+        texts = []
+        for audio_path in audio_paths:
+            segments, _ = self._local_pipeline.transcribe(
+                audio_path, language="en", beam_size=1, batch_size=8)
+            texts.append("".join(segment.text for segment in segments).strip())
+        return texts
 
     async def _summarize_text(self, text: str, max_length: int = 500) -> str:
         """
@@ -322,65 +667,111 @@ class VideoTranscriber:
         Returns:
             Summary text
         """
-        loop = asyncio.get_event_loop()
-
-        def summarize():
-            # Truncate input if too long (to manage token limits)
-            max_input_chars = 12000  # Approximate safe limit for context
-            truncated_text = text[:max_input_chars] if len(
-                text) > max_input_chars else text
-
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that creates concise, informative summaries of video transcripts. Focus on the main topics, key points, and important details."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Please provide a comprehensive summary of the following video transcript. Include the main topics discussed, key points, and any important conclusions or takeaways:\n\n{truncated_text}"
-                    }
-                ],
-                max_tokens=max_length
-            )
-            return response.choices[0].message.content
-
-        # Run in executor to avoid blocking
-        summary = await loop.run_in_executor(None, summarize)
-        return summary
+        # Truncate input if too long (to manage token limits)
+        max_input_chars = 12000  # Approximate safe limit for context
+        truncated_text = text[:max_input_chars] if len(
+            text) > max_input_chars else text
+
+        async for attempt in self._retrying():
+            with attempt:
+                response = await self.client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a helpful assistant that creates concise, informative summaries of video transcripts. Focus on the main topics, key points, and important details."
+                        },
+                        {
+                            "role": "user",
+                            "content": f"Please provide a comprehensive summary of the following video transcript. Include the main topics discussed, key points, and any important conclusions or takeaways:\n\n{truncated_text}"
+                        }
+                    ],
+                    max_tokens=max_length
+                )
+        return response.choices[0].message.content
+
+    def _build_document(self, job: TranscriptionJob) -> dict:
+        """OpenSearch document for a transcribed job, as it will read once indexed"""
+        return {
+            'job_id': job.job_id,
+            'url': job.url,
+            'title': job.title,
+            'transcription': job.transcription,
+            'summary': job.summary,
+            'tags': job.tags,
+            'created_at': job.created_at.isoformat(),
+            'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+            'processing_time_seconds': job.processing_time_seconds,
+            'status': ProcessingStage.COMPLETED.value
+        }
 
     async def _upload_to_opensearch(self, job: TranscriptionJob):
-        """Upload transcription data to OpenSearch"""
+        """Queue the job for OpenSearch; its document is built and sent by _flush_uploads"""
         if not self.opensearch_client:
             return
 
+        size = len(self.opensearch_client.transport.serializer.dumps(self._build_document(job)).encode())
+        if size > MAX_BULK_BYTES:
+            raise ValueError(f"Document is {size} bytes, over the {MAX_BULK_BYTES} byte bulk request limit")
+        self._pending_uploads.append(job)
+
+    async def _flush_uploads(self):
+        """Index all queued jobs in bulk requests, refresh the index once, then mark them COMPLETED or FAILED"""
+        jobs, self._pending_uploads = self._pending_uploads, []
         loop = asyncio.get_event_loop()
 
         def upload():
-            document = {
-                'job_id': job.job_id,
-                'url': job.url,
-                'title': job.title,
-                'transcription': job.transcription,
-                'summary': job.summary,
-                'tags': job.tags,
-                'created_at': job.created_at.isoformat(),
-                'completed_at': job.completed_at.isoformat() if job.completed_at else None,
-                'processing_time_seconds': (job.completed_at - job.created_at).total_seconds() if job.completed_at else None,
-                'status': job.status.value
-            }
-
-            response = self.opensearch_client.index(
-                index=self.opensearch_index,
-                id=job.job_id,
-                body=document,
-                refresh=True
+            actions = (
+                {
+                    '_op_type': 'index',
+                    '_index': self.opensearch_index,
+                    '_id': job.job_id,
+                    '_source': self._build_document(job)
+                }
+                for job in jobs
             )
-            
-            print(f"Uploaded to OpenSearch: {response['_id']}")
-
-        await loop.run_in_executor(None, upload)
+            success, errors = 0, []
+            for ok, item in helpers.streaming_bulk(
+                self.opensearch_client,
+                actions,
+                chunk_size=500,
+                max_chunk_bytes=MAX_BULK_BYTES,
+                raise_on_error=False,
+                request_timeout=60,
+                # documents rejected with 429 (indexing queue full) are resent with backoff
+                max_retries=self.max_retries
+            ):
+                if ok:
+                    success += 1
+                else:
+                    errors.append(item)
+            # make the new documents searchable in one refresh instead of one per document
+            self.opensearch_client.indices.refresh(index=self.opensearch_index)
+            return success, errors
+
+        # a retry re-sends every action; indexing by _id makes that idempotent
+        try:
+            async for attempt in self._retrying():
+                with attempt:
+                    success, errors = await loop.run_in_executor(self._executor, upload)
+        except Exception as e:
+            for job in jobs:
+                self._fail_job(job, RuntimeError(f"OpenSearch upload failed: {e}"))
+            return
+        logger.info("Uploaded %d document(s) to OpenSearch", success)
+
+        failed_ids = set()
+        for error in errors:
+            item = next(iter(error.values()))
+            job = self._jobs.get(item.get('_id'))
+            if job:
+                failed_ids.add(job.job_id)
+                job.error = f"OpenSearch indexing failed: {item.get('error')}"
+                self._set_status(job, ProcessingStage.FAILED)
+                logger.error("Error uploading %s: %s", job.url, item.get('error'))
+        for job in jobs:
+            if job.job_id not in failed_ids:
+                self._set_status(job, ProcessingStage.COMPLETED)
 
     async def add_tags_to_job(self, job_id: str, tags: List[str]):
         """Add tags to an existing job in OpenSearch"""
@@ -400,7 +791,21 @@ class VideoTranscriber:
                 }
             )
 
-        await loop.run_in_executor(None, update_tags)
+        async for attempt in self._retrying():
+            with attempt:
+                await loop.run_in_executor(self._executor, update_tags)
+
+
+def start_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Send log records through a queue to a single listener thread that writes them to stderr,
+    so concurrent jobs never block on the console; stop the returned listener to flush it
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(level=level, handlers=[logging.handlers.QueueHandler(log_queue)])
+    listener.start()
+    return listener
 
 
 async def main():
@@ -421,21 +826,23 @@ async def main():
     print("🚀 Starting video transcription...")
     print(f"📹 Processing {len(urls)} video(s)\n")
 
-    jobs = await transcriber.transcribe_videos(urls, tags=tags)
+    try:
+        jobs = await transcriber.transcribe_videos(urls, tags=tags)
+    finally:
+        await transcriber.close()
 
     print("\n" + "="*60)
     print("📊 TRANSCRIPTION SUMMARY")
     print("="*60)
 
-    successful_jobs = [j for j in jobs if j.status ==
-                       ProcessingStage.COMPLETED]
-    failed_jobs = [j for j in jobs if j.status == ProcessingStage.FAILED]
+    successful_jobs = transcriber.get_jobs_by_status(ProcessingStage.COMPLETED)
+    failed_jobs = transcriber.get_jobs_by_status(ProcessingStage.FAILED)
 
     print(f"\n✅ Successful: {len(successful_jobs)}/{len(jobs)}")
     print(f"❌ Failed: {len(failed_jobs)}/{len(jobs)}")
 
     for job in successful_jobs:
-        processing_time = (job.completed_at - job.created_at).total_seconds()
+        processing_time = job.processing_time_seconds
         print(f"\n📹 {job.title}")
         print(f"   Job ID: {job.job_id}")
         print(f"   Processing time: {processing_time:.1f}s")
@@ -449,4 +856,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    log_listener = start_logging()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
\ No newline at end of file
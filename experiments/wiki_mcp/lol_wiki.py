@@ -1,10 +1,15 @@
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 import httpx
-import json
-from bs4 import BeautifulSoup
+import orjson
+from diskcache import Cache
+from lxml import etree
 from enum import Enum, auto
-from typing import List, Callable, Any
+from typing import List, Callable, Any, Awaitable
+from urllib.parse import quote
 import asyncio
+import functools
+import os
+
 
 mcp = FastMCP("LolWikiServer")
 
@@ -18,14 +23,6 @@ class PageType(Enum):
     # LATEST_PATCH = auto()
 
 
-VALID_KEYS = {  # these are the valid page names, e.g. CHAMPION = ['Aatrox', ...]
-    PageType.CHAMPION: [],
-    PageType.RUNE: [],
-    PageType.SUMMONER_SPELL: [],
-    PageType.ITEM: [],
-    PageType.MONSTER: []
-}
-
 DATA_FILES = {
     PageType.CHAMPION: "experiments/wiki_mcp/dragontail_data/champion.json",
     PageType.RUNE: "experiments/wiki_mcp/dragontail_data/runesReforged.json",
@@ -34,41 +31,8 @@ DATA_FILES = {
     # MONSTER handled separately below
 }
 
-for page_type, file_path in DATA_FILES.items():
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            match page_type:
-                case PageType.CHAMPION:
-                    VALID_KEYS[PageType.CHAMPION] = [
-                        champion_data["name"]
-                        for champion_data in data["data"].values()
-                    ]
-                case PageType.RUNE:
-                    VALID_KEYS[PageType.RUNE] = [
-                        rune["name"]
-                        for tree in data
-                        for slot in tree.get("slots", [])
-                        for rune in slot.get("runes", [])
-                    ]
-                case PageType.SUMMONER_SPELL:
-                    VALID_KEYS[PageType.SUMMONER_SPELL] = [
-                        spell_data["name"]
-                        for spell_data in data["data"].values()
-                        if "modes" in spell_data and "CLASSIC" in spell_data["modes"]
-                    ]
-                case PageType.ITEM:
-                    VALID_KEYS[PageType.ITEM] = [
-                        item_data["name"]
-                        for item_data in data["data"].values()
-                        if "maps" in item_data and item_data["maps"].get("11") is True
-                    ]
-    except Exception as e:
-        print(f"Error loading data for {page_type.name}: {e}")
-
-
 # strangely, dragontail doesn't appear to have monster names :/
-VALID_KEYS[PageType.MONSTER] = [
+MONSTER_NAMES = [
     "Atakhan",
     "Chemtech Drake",
     "Cloud Drake",
@@ -83,7 +47,7 @@ VALID_KEYS[PageType.MONSTER] = [
     "Ancient Krug",
     "Blue Sentinel",
     "Crimson Raptor",
-    "Greater Murk Wolf"
+    "Greater Murk Wolf",
     "Gromp",
     "Red Brambleback",
     "Rift Scuttler",
@@ -94,75 +58,344 @@ VALID_KEYS[PageType.MONSTER] = [
     "Voidmite",
 ]
 
+
+@functools.cache
+def get_valid_keys(page_type: PageType) -> List[str]:
+    """
+    Return the valid page names for a page type, e.g. CHAMPION -> ['Aatrox', ...].
+    Each data file is only read the first time its page type is used.
+    """
+    if page_type == PageType.MONSTER:
+        return MONSTER_NAMES
+
+    try:
+        # orjson parses the raw bytes directly, without decoding to str first
+        with open(DATA_FILES[page_type], "rb") as file:
+            data = orjson.loads(file.read())
+        match page_type:
+            case PageType.CHAMPION:
+                return [
+                    champion_data["name"]
+                    for champion_data in data["data"].values()
+                ]
+            case PageType.RUNE:
+                return [
+                    rune["name"]
+                    for tree in data
+                    for slot in tree.get("slots", [])
+                    for rune in slot.get("runes", [])
+                ]
+            case PageType.SUMMONER_SPELL:
+                return [
+                    spell_data["name"]
+                    for spell_data in data["data"].values()
+                    if "modes" in spell_data and "CLASSIC" in spell_data["modes"]
+                ]
+            case PageType.ITEM:
+                return [
+                    item_data["name"]
+                    for item_data in data["data"].values()
+                    if "maps" in item_data and item_data["maps"].get("11") is True
+                ]
+    except Exception as e:
+        print(f"Error loading data for {page_type.name}: {e}")
+    return []
+
+
+@functools.cache
+def get_valid_names(page_type: PageType) -> dict[str, str]:
+    """Case-insensitive lookup of canonical page names, to reject typos before making any request."""
+    return {name.casefold(): name for name in get_valid_keys(page_type)}
+
+
 LOL_WIKI_BASE = "https://wiki.leagueoflegends.com/en-us"
+WIKI_BASE_URL = httpx.URL(LOL_WIKI_BASE + "/")
 USER_AGENT = "CoachAltMCP"
 # the amount of recent patch history to consider e.g. for champion pages
 NUM_RECENT_PATCHES = 3
 
+# parsed page text is cached on disk; pages only change with patches, so a few hours of staleness is fine
+WIKI_CACHE_DIR = "experiments/wiki_mcp/.wiki_cache"
+WIKI_CACHE_TTL = 6 * 60 * 60
+
+
+@functools.cache
+def get_wiki_cache() -> Cache:
+    """Open the page cache on first use, so importing this module doesn't create WIKI_CACHE_DIR."""
+    return Cache(WIKI_CACHE_DIR)
+
+
+# pages are parsed while they download, STREAM_CHUNK_SIZE bytes at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# ETag / Last-Modified of each fetched page plus its parsed text, so a refetch after the disk cache entry
+# expires (or with force_refresh) can be a conditional GET that the wiki answers with an empty 304
+_validators: dict[tuple[str, str], tuple[str | None, str | None, str]] = {}
+
+# fetches currently in progress, keyed like the page cache, so concurrent calls for the same page share one
+_inflight: dict[tuple[str, str], asyncio.Task[str]] = {}
+
+# shared across tool calls so wiki requests reuse pooled keep-alive (HTTP/2) connections
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
 
-async def parse_wiki_page(page_url: str, page_type: PageType = PageType.CHAMPION) -> str | None:
-    headers = {
-        "User-Agent": USER_AGENT
-    }
-
-    def limit_patch_history(soup: BeautifulSoup, num_children: int = NUM_RECENT_PATCHES * 2) -> None:
-        """
-        Finds the patch history element by style and keeps only the first num_children children.
-        Removes the rest.
-        """
-        patch_history_elem = soup.find(
-            "div",
-            attrs={
-                "style": lambda value: value and
-                "overflow:auto" in value and
-                "max-height:" in value and
-                "var(--league-grey-2)" in value
-            }
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared wiki client, creating it on first use.
+    A client is tied to the event loop it was created in, so a new one is made if the loop changes
+    (e.g. separate asyncio.run calls in lol_wiki_test.py).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(20.0),
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60),
+            # the wiki redirects alternate spellings (e.g. spaces vs underscores) to the canonical page
+            follow_redirects=True
         )
-        if patch_history_elem:
-            children = list(patch_history_elem.children)
-            for child in children[num_children:]:
-                child.extract()
+        _client_loop = loop
+    return _client
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(page_url, headers=headers, timeout=20.0)
-            response.raise_for_status()
-            html = response.text
-            soup = BeautifulSoup(html, "html.parser")
-
-            content_elem = soup.find(id="content")
-            if content_elem:
-                soup = content_elem
-            # Fallback to full page if content element not found
-
-            # remove random garbage
-            for elem in soup.select(".hidden-metadata.navigation-not-searchable"):
-                elem.decompose()
-
-            # extra processing and garbage removal based on page type
-            match page_type:
-                case PageType.CHAMPION:
-                    # remove skins info
-                    for elem in soup.select(".lazyimg-wrapper"):
-                        elem.decompose()
-
-            limit_patch_history(soup)
-
-            main_content = " ".join(soup.stripped_strings)
+
+class AdmissionController:
+    """
+    Admits at most max_concurrency wiki requests at a time, so large fan-outs queue here instead of
+    exhausting the client's connection pool. The limit can be changed while requests are waiting.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.max_concurrency)
+            self.active += 1
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify(1)
+
+    async def set_max_concurrency(self, max_concurrency: int) -> None:
+        async with self._cond:
+            self.max_concurrency = max_concurrency
+            self._cond.notify_all()
+
+
+MAX_CONCURRENT_FETCHES = int(os.environ.get("LOL_WIKI_MAX_CONCURRENCY", 8))
+_admission: AdmissionController | None = None
+_admission_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_admission() -> AdmissionController:
+    """Return the admission controller for the running event loop, like get_client."""
+    global _admission, _admission_loop
+    loop = asyncio.get_running_loop()
+    if _admission is None or _admission_loop is not loop:
+        _admission = AdmissionController(MAX_CONCURRENT_FETCHES)
+        _admission_loop = loop
+    return _admission
+
+
+async def close_client() -> None:
+    """Close the shared wiki client; call before the event loop that owns it shuts down."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+
+
+class WikiTextParser:
+    """
+    Incrementally parses a wiki page and extracts the text of its #content element.
+    Text is collected in document order as soon as it is complete and parsed elements are freed, so
+    only a small window of the page is kept in memory. Dropped along the way:
+    - script and style elements
+    - hidden metadata (.hidden-metadata.navigation-not-searchable)
+    - skins info on champion pages (.lazyimg-wrapper)
+    - patch history beyond the NUM_RECENT_PATCHES most recent patches
+    """
+
+    def __init__(self, page_type: PageType, encoding: str | None = None):
+        self.page_type = page_type
+        self.parser = etree.HTMLPullParser(events=("start", "end", "comment", "pi"), encoding=encoding)
+        self.parts: List[str] = []
+        # (is_content, is_skipped) for each open element
+        self.open_elements: List[tuple[bool, bool]] = []
+        self.content_depth = 0
+        self.skip_depth = 0
+        self.patch_history = None
+        self.patch_history_children = 0
+
+    def feed(self, data: bytes) -> None:
+        self.parser.feed(data)
+        self._handle_events()
+
+    def close(self) -> str:
+        self.parser.close()
+        self._handle_events()
+        return " ".join(self.parts)
+
+    def _add_text(self, text: str | None, container) -> None:
+        """Collect text whose enclosing element is container, unless that part of the page is dropped."""
+        if not text or not self.content_depth or self.skip_depth:
+            return
+        if container is not None and container is self.patch_history and \
+                self.patch_history_children > NUM_RECENT_PATCHES * 2:
+            return
+        text = text.strip()
+        if text:
+            self.parts.append(text)
+
+    def _is_patch_history(self, elem) -> bool:
+        """The patch history element is recognized by its style."""
+        style = elem.get("style") or ""
+        return "overflow:auto" in style and "max-height:" in style and "var(--league-grey-2)" in style
+
+    def _is_skipped(self, elem) -> bool:
+        if elem.tag in ("script", "style"):
+            return True
+        classes = (elem.get("class") or "").split()
+        # remove random garbage
+        if "hidden-metadata" in classes and "navigation-not-searchable" in classes:
+            return True
+        # extra garbage removal based on page type
+        match self.page_type:
+            case PageType.CHAMPION:
+                # remove skins info
+                return "lazyimg-wrapper" in classes
+        return False
+
+    def _handle_events(self) -> None:
+        for event, elem in self.parser.read_events():
+            if event == "end":
+                # the element's own text, or the tail of its last child, is the last text inside it
+                last = elem[-1] if len(elem) else None
+                self._add_text(last.tail if last is not None else elem.text, elem)
+                is_content, is_skipped = self.open_elements.pop()
+                self.content_depth -= is_content
+                self.skip_depth -= is_skipped
+                elem.clear(keep_tail=True)
+                continue
+
+            # start of an element, or a complete comment / processing instruction:
+            # the text right before it (its parent's text, or the previous sibling's tail) is now complete
+            # top-level nodes (the root, or a comment / PI outside it) have neither text nor siblings to handle
+            parent = elem.getparent()
+            if parent is not None:
+                previous = elem.getprevious()
+                if previous is not None:
+                    self._add_text(previous.tail, parent)
+                else:
+                    self._add_text(parent.text, parent)
+                # earlier siblings are fully processed
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+            if event != "start":
+                continue
+
+            is_skipped = self._is_skipped(elem)
+            if parent is not None and parent is self.patch_history:
+                # element children only (a heading and a list per patch), so the NUM_RECENT_PATCHES newest patches
+                # are kept whatever whitespace sits between them; counting whitespace text nodes as children, as
+                # the BeautifulSoup version did, kept only about half as many
+                self.patch_history_children += 1
+                is_skipped = is_skipped or self.patch_history_children > NUM_RECENT_PATCHES * 2
+            is_content = elem.get("id") == "content"
+            self.open_elements.append((is_content, is_skipped))
+            self.content_depth += is_content
+            self.skip_depth += is_skipped
+
+            if self.patch_history is None and self.content_depth and self._is_patch_history(elem):
+                self.patch_history = elem
+
+
+async def parse_wiki_page(
+    page_url: str,
+    page_type: PageType = PageType.CHAMPION,
+    force_refresh: bool = False
+) -> str | None:
+    cache_key = (page_url, page_type.name)
+    if not force_refresh:
+        cached = get_wiki_cache().get(cache_key)
+        if cached is not None:
+            return cached
+
+    async def fetch() -> str:
+        async with get_admission():
+            headers = {}
+            validated = _validators.get(cache_key)
+            if validated is not None:
+                etag, last_modified, _ = validated
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+            async with get_client().stream("GET", page_url, headers=headers) as response:
+                if response.status_code == 304 and validated is not None:
+                    # unchanged since the last fetch: no body was sent and nothing needs parsing
+                    main_content = validated[2]
+                    get_wiki_cache().set(cache_key, main_content, expire=WIKI_CACHE_TTL)
+                    return main_content
+                response.raise_for_status()
+
+                # parse each chunk as it arrives instead of waiting for the whole page
+                parser = WikiTextParser(page_type, response.charset_encoding)
+                async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                    parser.feed(chunk)
+                main_content = parser.close()
+            if not main_content:
+                # no #content element (or nothing in it): not a page worth caching
+                raise ValueError(f"No content found at {page_url}")
+
+            get_wiki_cache().set(cache_key, main_content, expire=WIKI_CACHE_TTL)
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                _validators[cache_key] = (etag, last_modified, main_content)
             return main_content
-        except Exception:
-            return (
-                f"{page_type.name.capitalize()} not found. "
-                "You may be trying to fetch an invalid page. "
-                f"Valid {page_type.name.lower()}s: {VALID_KEYS[page_type]}"
-            )
+
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(fetch())
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+
+    try:
+        # shielded so one cancelled caller doesn't cancel the fetch other callers are waiting on
+        return await asyncio.shield(task)
+    except Exception:
+        return (
+            f"{page_type.name.capitalize()} not found. "
+            "You may be trying to fetch an invalid page. "
+            f"Valid {page_type.name.lower()}s: {get_valid_keys(page_type)}"
+        )
+
+
+def format_task_result(task_name: str, result: Any) -> str:
+    """Format one task's result, or the error it raised, for the combined output."""
+    if isinstance(result, Exception):
+        return f"Error executing {task_name}: {str(result)}"
+    if result is None:
+        return f"Error fetching data for {task_name}: No data returned"
+    return str(result)
 
 
 async def execute_tasks_and_combine(
     tasks: List[Callable[[], Any]],
     task_names: List[str] = None,
-    separator: str = "\n\n"
+    separator: str = "\n\n",
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None
 ) -> str:
     """
     Execute a list of async tasks concurrently and combine their results into a single string.
@@ -171,120 +404,164 @@ async def execute_tasks_and_combine(
         tasks: List of async functions/coroutines to execute
         task_names: Optional list of names for error reporting (defaults to task index)
         separator: String to join results with (default: "\n\n")
+        on_progress: Optional callback awaited with (completed, total) as each task finishes
 
     Returns:
-        Combined string result of all tasks
+        Combined string result of all tasks, in the order of tasks
     """
     if task_names is None:
         task_names = [f"Task {i}" for i in range(len(tasks))]
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def run(i: int, task) -> tuple[int, Any]:
+        try:
+            return i, await task
+        except Exception as e:
+            return i, e
+
+    results: List[Any] = [None] * len(tasks)
+    for completed, next_done in enumerate(
+        asyncio.as_completed([run(i, task) for i, task in enumerate(tasks)]), start=1
+    ):
+        i, result = await next_done
+        results[i] = result
+        if on_progress is not None:
+            await on_progress(completed, len(tasks))
+
+    return separator.join(
+        format_task_result(task_names[i] if i < len(task_names) else f"Task {i}", result)
+        for i, result in enumerate(results)
+    )
+
+
+def wiki_page_url(name: str) -> str:
+    """
+    Build the wiki URL for a page name, e.g. "Kai'Sa" -> .../en-us/Kai%27Sa.
+    Spaces become underscores as in the wiki's own links, so each page has one URL (and cache key).
+    """
+    return str(WIKI_BASE_URL.join(quote(name.replace(" ", "_"), safe="")))
 
-    combined_data = []
-    for i, result in enumerate(results):
-        task_name = task_names[i] if i < len(task_names) else f"Task {i}"
 
-        if isinstance(result, Exception):
-            combined_data.append(f"Error executing {task_name}: {str(result)}")
-        elif result is None:
-            combined_data.append(
-                f"Error fetching data for {task_name}: No data returned")
+def resolve_names(names: List[str], page_type: PageType) -> tuple[List[str], List[str]]:
+    """
+    Split requested names into known page names (canonically cased) and unknown names.
+    If no valid names were loaded for the page type, every name is treated as known.
+    """
+    valid_names = get_valid_names(page_type)
+    if not valid_names:
+        return names, []
+
+    known, unknown = [], []
+    for name in names:
+        canonical = valid_names.get(name.casefold())
+        if canonical:
+            known.append(canonical)
         else:
-            combined_data.append(str(result))
+            unknown.append(name)
+    return known, unknown
 
-    return separator.join(combined_data)
+
+async def fetch_wiki_pages(
+    names: List[str],
+    page_type: PageType,
+    force_refresh: bool = False,
+    ctx: Context | None = None
+) -> str:
+    """
+    Fetch the wiki pages for the known names and report unknown names without fetching them.
+    Pages are returned in the order requested; with a tool context, progress is reported to the client
+    as each page finishes.
+    """
+    known, unknown = resolve_names(names, page_type)
+
+    results = []
+    if known:
+        tasks = [
+            parse_wiki_page(wiki_page_url(name), page_type, force_refresh)
+            for name in known
+        ]
+        on_progress = ctx.report_progress if ctx is not None else None
+        results.append(await execute_tasks_and_combine(tasks, known, on_progress=on_progress))
+    if unknown:
+        results.append(
+            f"Unknown {page_type.name.lower()}s: {unknown}. "
+            f"Valid {page_type.name.lower()}s: {get_valid_keys(page_type)}"
+        )
+    return "\n\n".join(results)
 
 
 @mcp.tool()
-async def get_champion_data(champion_names: List[str] = ["Janna"]) -> str:
+async def get_champion_data(champion_names: List[str] = ["Janna"], force_refresh: bool = False, ctx: Context = None) -> str:
     """
     Get the page from the official League of Legends wiki for the given champions as text.
     The number of champions per call should be at most 5.
+    Pages are cached for a few hours; set force_refresh to true to fetch the latest version.
     This provides an up-to-date overview of abilities, champion playstyle, stats, and recent patch history.
     Info provided: class, range type, HP, armor, etc.
     """
     MAX_CHAMPIONS_PER_CALL = 5
     champion_names = champion_names[:MAX_CHAMPIONS_PER_CALL]
 
-    tasks = [
-        parse_wiki_page(f"{LOL_WIKI_BASE}/{champion_name}", PageType.CHAMPION)
-        for champion_name in champion_names
-    ]
-
-    return await execute_tasks_and_combine(tasks, champion_names)
+    return await fetch_wiki_pages(champion_names, PageType.CHAMPION, force_refresh, ctx)
 
 
 @mcp.tool()
-async def get_runes_data(runes: List[str] = ["Dark Harvest"]) -> str:
+async def get_runes_data(runes: List[str] = ["Dark Harvest"], force_refresh: bool = False, ctx: Context = None) -> str:
     """
     Get the page from the official League of Legends wiki for the given runes as text.
     The number of runes per call should be at most 5.
+    Pages are cached for a few hours; set force_refresh to true to fetch the latest version.
     This provides an up-to-date overview of rune stats and what it does.
     Runes are enhancements that add new abilities or buffs to the champion.
     The player can choose their loadout of runes before the match begins, during champion select, or their Collection tab.
     """
     MAX_RUNES_PER_CALL = 5
     runes = runes[:MAX_RUNES_PER_CALL]
-    tasks = [
-        parse_wiki_page(f"{LOL_WIKI_BASE}/{rune}", PageType.RUNE)
-        for rune in runes
-    ]
-    return await execute_tasks_and_combine(tasks, runes)
+    return await fetch_wiki_pages(runes, PageType.RUNE, force_refresh, ctx)
 
 
 @mcp.tool()
-async def get_summoner_spell_data(summoner_spells: List[str] = ["Flash"]) -> str:
+async def get_summoner_spell_data(summoner_spells: List[str] = ["Flash"], force_refresh: bool = False, ctx: Context = None) -> str:
     """
     Get the page from the official League of Legends wiki for the given summoner spells as text.
     The number of summoner spells per call should be at most 5.
+    Pages are cached for a few hours; set force_refresh to true to fetch the latest version.
     This provides an up-to-date overview of summoner spell stats and what it does.
     Summoner spells are special abilities that all players can have access to based on the map, in addition to their champion abilities.
     Players choose their two preferred summoner spells during champion select.
     """
     MAX_SUMMONER_SPELLS_PER_CALL = 5
     summoner_spells = summoner_spells[:MAX_SUMMONER_SPELLS_PER_CALL]
-    tasks = [
-        parse_wiki_page(f"{LOL_WIKI_BASE}/{summoner_spell}",
-                        PageType.SUMMONER_SPELL)
-        for summoner_spell in summoner_spells
-    ]
-    return await execute_tasks_and_combine(tasks, summoner_spells)
+    return await fetch_wiki_pages(summoner_spells, PageType.SUMMONER_SPELL, force_refresh, ctx)
 
 
 @mcp.tool()
-async def get_item_data(items: List[str] = ["Boots of Swiftness"]) -> str:
+async def get_item_data(items: List[str] = ["Boots of Swiftness"], force_refresh: bool = False, ctx: Context = None) -> str:
     """
     Get the page from the official League of Legends wiki for the given items as text.
     The number of items per call should be at most 5.
+    Pages are cached for a few hours; set force_refresh to true to fetch the latest version.
     This provides an up-to-date overview of an item's stats, what it does, and possible how it affects strategy.
     An item is a modular enhancement that grants bonuses and capabilities beyond what champions have access to by default.
     Most items can be purchased from the shop in exchange for An icon representing Gold gold while near the spawn, while a small number of them may be distributed to players from various effects.
     """
     MAX_ITEMS_PER_CALL = 5
     items = items[:MAX_ITEMS_PER_CALL]
-    tasks = [
-        parse_wiki_page(f"{LOL_WIKI_BASE}/{item}", PageType.ITEM)
-        for item in items
-    ]
-    return await execute_tasks_and_combine(tasks, items)
+    return await fetch_wiki_pages(items, PageType.ITEM, force_refresh, ctx)
 
 
 @mcp.tool()
-async def get_monster_data(monster_names: List[str] = ["Blue Sentinel"]) -> str:
+async def get_monster_data(monster_names: List[str] = ["Blue Sentinel"], force_refresh: bool = False, ctx: Context = None) -> str:
     """
     Get the page from the official League of Legends wiki for the given monsters as text.
     The number of monsters per call should be at most 5.
+    Pages are cached for a few hours; set force_refresh to true to fetch the latest version.
     This provides an up-to-date overview of monster stats, HP, resistances, reward buffs, and possibly how it influences strategy.
     Monsters are neutral units in League of Legends.
     Unlike minions, monsters do not fight for either team, and will only do so if provoked.
     """
     MAX_MONSTERS_PER_CALL = 5
     monster_names = monster_names[:MAX_MONSTERS_PER_CALL]
-    tasks = [
-        parse_wiki_page(f"{LOL_WIKI_BASE}/{monster_name}", PageType.MONSTER)
-        for monster_name in monster_names
-    ]
-    return await execute_tasks_and_combine(tasks, monster_names)
+    return await fetch_wiki_pages(monster_names, PageType.MONSTER, force_refresh, ctx)
 
 
 # TODO: implement this
@@ -293,5 +570,17 @@ async def get_monster_data(monster_names: List[str] = ["Blue Sentinel"]) -> str:
 #     return ""
 
 
+async def serve() -> None:
+    """
+    Run the server over streamable HTTP and close the shared wiki client once it stops.
+    This is process-wide: FastMCP's lifespan hook runs once per session, so closing the client there would
+    break fetches still running in other sessions.
+    """
+    try:
+        await mcp.run_streamable_http_async()
+    finally:
+        await close_client()
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
+    asyncio.run(serve())
@@ -1,7 +1,15 @@
-from lol_wiki import VALID_KEYS, PageType, get_champion_data, get_runes_data, get_summoner_spell_data, get_monster_data, get_item_data
+from lol_wiki import get_valid_keys, PageType, WikiTextParser, get_champion_data, get_runes_data, get_summoner_spell_data, get_monster_data, get_item_data
 import asyncio
 
 if __name__ == "__main__":
+    # comments and processing instructions outside <html> have no parent element and must not break parsing
+    page = b'<?xml version="1.0"?><!-- before --><html><body><div id="content"><p>Hi</p></div></body></html><!-- after -->'
+    for chunk_size in (1, 7, len(page)):
+        parser = WikiTextParser(PageType.CHAMPION)
+        for i in range(0, len(page), chunk_size):
+            parser.feed(page[i:i + chunk_size])
+        assert parser.close() == "Hi"
+
     # print(asyncio.run(get_champion_data(["Janna", "Aatrox"])))
     # print(asyncio.run(get_summoner_spell_data(["Flash", "Heal"])))
     # print(asyncio.run(get_runes_data(["Legend: Bloodline", "Fleet Footwork"])))
@@ -15,4 +23,4 @@ if __name__ == "__main__":
     print(asyncio.run(get_item_data(["Rookernaaa"])))
 
     # for page_type in PageType:
-    #     print(VALID_KEYS[page_type])
+    #     print(get_valid_keys(page_type))